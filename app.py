@@ -1,34 +1,31 @@
 import streamlit as st
 import plotly.express as px
 from data_collection.github_api import GitHubDataCollector
-from data_collection.data_storage import store_data_to_csv
-from metrics.calculator import MetricsCalculator
+from data_collection.data_storage import store_metrics
+from data_collection.metrics_history import append_snapshot
+# Repository data and metrics are cached per repository version instead of on a timer
+from metrics.batch import calculate_metrics_batch, calculate_repository_metrics, fetch_repository_data
+from metrics.registry import metric_names, required_datasets
 from visualization.dashboard import Dashboard
+from query_interface.intent_router import get_intent_router
 from query_interface.nlp_processor import NLPProcessor
 from query_interface.response_generator import ResponseGenerator
 import matplotlib.pyplot as plt
 
 
+# One collector for every session, so its connection pool stays warm between clicks
+@st.cache_resource
+def get_data_collector():
+    return GitHubDataCollector()
+
 # Cache the result of GitHub API calls to avoid repeated calls
 @st.cache_data(ttl=3600)  # Cache for 1 hour
 def fetch_repositories_and_stats(username):
-    data_collector = GitHubDataCollector()
+    data_collector = get_data_collector()
     repos = data_collector.get_user_repositories(username)
     dev_stats = data_collector.get_user_info(username)
     return repos, dev_stats
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def fetch_repository_data(repo_name):
-    data_collector = GitHubDataCollector()
-    repo_data = data_collector.get_repo_data(repo_name)
-    return repo_data
-
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def calculate_repository_metrics(_repo_data):
-    calculator = MetricsCalculator(repo_data)
-    metrics_df = calculator.calculate_metrics()
-    return metrics_df
-
 # Initialize session state variables if they are not already
 if 'repositories' not in st.session_state:
     st.session_state.repositories = []
@@ -357,23 +354,57 @@ with tab2:
         # Dropdown to select repository
         selected_repo = st.selectbox("Select a repository", options=st.session_state.repositories)
         st.session_state.selected_repo = selected_repo
+        # Only the datasets the chosen metrics need are fetched, e.g. no per-PR reviews for commit stats
+        all_metrics = metric_names()
+        selected_metrics = st.multiselect("Metrics to calculate", options=all_metrics, default=all_metrics)
 
         if st.button("Fetch Metrics"):
             try:
+                complete = len(selected_metrics) == len(all_metrics)
                 # Fetch repository data and metrics (cached)
-                repo_data = fetch_repository_data(st.session_state.selected_repo)
+                repo_data = fetch_repository_data(
+                    st.session_state.selected_repo, data_collector=get_data_collector(),
+                    datasets=None if complete else required_datasets(selected_metrics),
+                )
                 st.session_state.repo_data = repo_data
 
                 # Calculate repository metrics (cached)
-                metrics_df = calculate_repository_metrics(repo_data)
+                metrics_df = calculate_repository_metrics(repo_data, None if complete else selected_metrics)
                 st.session_state.metrics_df = metrics_df
 
-                # Store the calculated metrics to a CSV file
-                store_data_to_csv(st.session_state.username, st.session_state.selected_repo, metrics_df)
+                # Only complete runs are stored, so a subset never overwrites the full row or the trend history
+                if complete:
+                    # Store the calculated metrics, refreshing any earlier run for this repo
+                    store_metrics(st.session_state.username, st.session_state.selected_repo, metrics_df)
+                    # Keep every run as a snapshot so trends can be queried later
+                    append_snapshot(st.session_state.username, metrics_df)
+                else:
+                    st.caption("Only some metrics were calculated, so this run is not stored.")
 
             except ValueError as e:
                 st.error(f"Error fetching data for the selected repository: {e}")
 
+        if st.button("Fetch Metrics for All Repositories"):
+            progress = st.progress(0.0, text="Starting batch run...")
+
+            def show_progress(done, total, repo_name, error):
+                status = f"failed: {error}" if error else "done"
+                progress.progress(done / total, text=f"{done}/{total} repositories ({repo_name} {status})")
+
+            # Every repository is collected and measured on a pool of worker processes
+            metrics_df = calculate_metrics_batch(st.session_state.repositories, on_progress=show_progress)
+            st.session_state.repo_data = None
+            st.session_state.metrics_df = metrics_df if not metrics_df.empty else None
+            if not metrics_df.empty:
+                for repo_name, repo_metrics_df in metrics_df.groupby("repo_name", sort=False):
+                    store_metrics(st.session_state.username, repo_name, repo_metrics_df.reset_index(drop=True))
+                append_snapshot(st.session_state.username, metrics_df)
+            if not metrics_df.empty:
+                st.subheader("All Repositories Combined")
+                st.write(metrics_df.attrs["rollup"])
+            if metrics_df.attrs["failed"]:
+                st.warning(f"Could not fetch {len(metrics_df.attrs['failed'])} repositories: {', '.join(metrics_df.attrs['failed'])}")
+
     if st.session_state.repo_data:
         st.subheader("Repository Information Overview")
         st.write({
@@ -393,7 +424,8 @@ with tab2:
 
     if st.session_state.metrics_df is not None:
         st.subheader("Repository Metrics Overview")
-        dashboard = Dashboard(st.session_state.metrics_df)
+        period_metrics = st.session_state.repo_data.get("period_metrics") if st.session_state.repo_data else None
+        dashboard = Dashboard(st.session_state.metrics_df, period_metrics.time_series() if period_metrics else None)
         dashboard.display()
     else:
         st.write("Please select a repository and fetch metrics.")
@@ -460,19 +492,21 @@ with tab3:
 
         if st.button("Ask"):
             if query:
-                with st.spinner('Processing your query...'):
-                    nlp_processor = NLPProcessor()
-                    response = nlp_processor.process_query(query, st.session_state.metrics_df)
-                    response_generator = ResponseGenerator()
-
-                    # Display the conversation with chat bubbles
-                    st.markdown(f'<div class="chat-container">', unsafe_allow_html=True)
-                    st.markdown(f'<div class="chat-bubble-user">{query}</div>', unsafe_allow_html=True)
-                    bot_response = response_generator.display_response(response)
-                    st.markdown(f'<div class="chat-bubble-bot">{bot_response}</div>', unsafe_allow_html=True)
-                    st.markdown('</div>', unsafe_allow_html=True)
+                nlp_processor = NLPProcessor()
+                response_generator = ResponseGenerator()
+
+                # Display the conversation with chat bubbles; the answer fills in as it is generated
+                st.markdown(f'<div class="chat-container">', unsafe_allow_html=True)
+                st.markdown(f'<div class="chat-bubble-user">{query}</div>', unsafe_allow_html=True)
+                response_generator.stream_response(nlp_processor.stream_query(query, st.session_state.metrics_df))
+                st.markdown('</div>', unsafe_allow_html=True)
             else:
                 st.error("Please enter a query.")
+
+        intent_router = get_intent_router()
+        if intent_router.hits + intent_router.misses:
+            st.caption(f"Answered locally without the LLM: {intent_router.hits} of "
+                       f"{intent_router.hits + intent_router.misses} questions ({intent_router.hit_rate:.0%})")
     else:
         st.write("Please fetch repository metrics before asking a question.")
 # --- Tab 4: About ---
@@ -0,0 +1,259 @@
+import asyncio
+import atexit
+import os
+import threading
+from collections import namedtuple
+from urllib.parse import parse_qs, urlparse
+
+import aiohttp
+from dotenv import load_dotenv
+
+from data_collection.events import CONTRIBUTION_EVENT_TYPES, EVENT_PAGE_LIMIT, EventAggregator
+from data_collection.github_api import DEFAULT_MAX_WORKERS, PAGE_SIZE
+from data_collection.language_cache import LanguageCache
+from data_collection.records import CommitRecord, IssueRecord, PullRequestRecord, ReviewRecord, parse_timestamp
+from data_collection.review_index import build_review_index
+from metrics.windows import PeriodMetrics
+
+load_dotenv()
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+# Kept-alive connections in the shared pool, across all collectors on the loop
+POOL_SIZE = int(os.getenv("GITPULSE_POOL_SIZE", "32"))
+
+# The subset of a repository LanguageCache needs to tell whether its breakdown is stale
+RepoVersion = namedtuple("RepoVersion", ["full_name", "pushed_at"])
+
+_sessions = {}
+
+
+def get_session():
+    """Returns the keep-alive session shared by every collector on the running event loop."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=POOL_SIZE, keepalive_timeout=60)
+        session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60))
+        _sessions[loop] = session
+    return session
+
+
+async def close_session():
+    """Closes the running loop's shared session; the next get_session() opens a new one."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+@atexit.register
+def _close_background_session():
+    # Closes the background loop's connections on exit instead of leaving an unclosed session behind
+    if _loop is not None and _loop.is_running():
+        asyncio.run_coroutine_threadsafe(close_session(), _loop).result(timeout=5)
+
+
+def run_sync(coroutine):
+    """Runs a coroutine on a long-lived background loop and waits for its result.
+
+    Synchronous callers (e.g. Streamlit sessions) share that loop, and with it one pool of warm
+    TCP/TLS connections, instead of each opening their own through asyncio.run.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="gitpulse-async-loop", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coroutine, _loop).result()
+
+
+class AsyncGitHubDataCollector:
+    """Asyncio counterpart of GitHubDataCollector's user and repository fetches, as coroutines.
+
+    Not a drop-in replacement: requests go straight to aiohttp, without the request scheduler, the
+    ETag cache or token rotation, and get_repo_data always fetches the full history (no incremental
+    or datasets). Callers outside a loop use run_sync; callers with their own loop await
+    close_session() before it closes.
+    """
+
+    def __init__(self, base_url=GITHUB_API_URL, max_concurrency=DEFAULT_MAX_WORKERS):
+        # Load the GitHub access token from the .env file
+        access_token = os.getenv("GITHUB_TOKEN")
+        if not access_token:
+            raise ValueError("GitHub access token is not set in the .env file.")
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"Authorization": f"token {access_token}", "Accept": "application/vnd.github+json"}
+        self.max_concurrency = max(max_concurrency, 1)
+        self.language_cache = LanguageCache()
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        # Created lazily so it binds to the loop the collector is actually used on
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _get(self, path, params=None):
+        """GETs an API path (or absolute URL) and returns (json, links)."""
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        async with self.semaphore:
+            async with get_session().get(url, params=params, headers=self.headers) as response:
+                response.raise_for_status()
+                return await response.json(), response.links
+
+    @staticmethod
+    def _last_page(links):
+        if "last" not in links:
+            return None
+        return int(parse_qs(urlparse(str(links["last"]["url"])).query)["page"][0])
+
+    async def _get_all(self, path, params=None):
+        """Fetches every page of a list endpoint.
+
+        The first page's Link header names the last page, so all remaining pages are requested at
+        once over the pooled connections instead of one after another.
+        """
+        params = {**(params or {}), "per_page": PAGE_SIZE}
+        first_page, links = await self._get(path, params)
+        last_page = self._last_page(links)
+        if not last_page:
+            return list(first_page)
+        pages = await asyncio.gather(*(self._get(path, {**params, "page": page}) for page in range(2, last_page + 1)))
+        return list(first_page) + [item for page, _ in pages for item in page]
+
+    async def _count(self, path, params=None):
+        """Counts a list endpoint's items with a single request, by asking for one item per page."""
+        items, links = await self._get(path, {**(params or {}), "per_page": 1})
+        return self._last_page(links) or len(items)
+
+    async def get_user_repositories(self, username):
+        """Fetches all repositories for a given GitHub user."""
+        try:
+            repos = await self._get_all(f"/users/{username}/repos")
+            return [repo["full_name"] for repo in repos]
+        except Exception as e:
+            raise ValueError(f"Failed to fetch user repositories: {e}")
+
+    async def get_user_languages(self, username):
+        """Fetches and aggregates the most used languages for a given GitHub user."""
+        try:
+            repos = [
+                RepoVersion(repo["full_name"], parse_timestamp(repo.get("pushed_at")))
+                for repo in await self._get_all(f"/users/{username}/repos")
+            ]
+            stale = self.language_cache.stale_repositories(username, repos)
+            languages = await asyncio.gather(*(self._get(f"/repos/{repo.full_name}/languages") for repo in stale))
+            fetched = {repo.full_name: repo_languages for repo, (repo_languages, _) in zip(stale, languages)}
+            return self.language_cache.update(username, repos, fetched)
+        except Exception as e:
+            raise ValueError(f"Failed to fetch user languages: {e}")
+
+    async def get_user_info(self, username):
+        """Fetches detailed information for a given GitHub username, including languages."""
+        try:
+            (user, _), event_breakdown, starred_repos_count, orgs, languages = await asyncio.gather(
+                self._get(f"/users/{username}"),
+                self.get_event_breakdown(username),
+                self._count(f"/users/{username}/starred"),
+                self._get_all(f"/users/{username}/orgs"),
+                self.get_user_languages(username),
+            )
+            return {
+                "avatar_url": user["avatar_url"],
+                "name": user["name"],
+                "bio": user["bio"],
+                "company": user["company"],
+                "location": user["location"],
+                "email": user["email"],
+                "public_repos": user["public_repos"],
+                "public_gists": user["public_gists"],
+                "followers": user["followers"],
+                "following": user["following"],
+                "starred_repos": starred_repos_count,
+                "contributions": (
+                    sum(event_breakdown.get(t, 0) for t in CONTRIBUTION_EVENT_TYPES) if event_breakdown is not None else "Unavailable"
+                ),
+                "event_breakdown": event_breakdown or {},
+                "organizations": [org["login"] for org in orgs],
+                "created_at": parse_timestamp(user["created_at"]).strftime("%Y-%m-%d"),
+                "languages": languages,
+            }
+        except Exception as e:
+            raise ValueError(f"Failed to fetch user information: {e}")
+
+    async def get_event_breakdown(self, username, max_pages=EVENT_PAGE_LIMIT, since=None):
+        """Reads the user's public event feed once and counts events by type."""
+        aggregator = EventAggregator(max_pages=max_pages, since=since)
+        try:
+            for page_number in range(1, max_pages + 1):
+                page, _ = await self._get(f"/users/{username}/events", {"per_page": PAGE_SIZE, "page": page_number})
+                events = ((event["type"], parse_timestamp(event["created_at"])) for event in page)
+                if not aggregator.add_page(events) or len(page) < PAGE_SIZE:
+                    break
+            return aggregator.breakdown()
+        except Exception:
+            return None
+
+    async def get_repo_data(self, repo_url):
+        """Collects data for a single repository including commits, PRs, issues, reviews, and additional metadata."""
+        repo_name = self.extract_repo_name(repo_url)
+        if not repo_name:
+            raise ValueError("Invalid GitHub repository URL. Please provide a valid URL.")
+
+        try:
+            path = f"/repos/{repo_name}"
+            (repo, _), labels, (topics, _), commits, pulls, issues = await asyncio.gather(
+                self._get(path),
+                self._get_all(f"{path}/labels"),
+                self._get(f"{path}/topics"),
+                self._get_all(f"{path}/commits"),
+                self._get_all(f"{path}/pulls", {"state": "all"}),
+                self._get_all(f"{path}/issues", {"state": "all"}),
+            )
+            reviews = await asyncio.gather(*(self._get_all(f"{path}/pulls/{pr['number']}/reviews") for pr in pulls))
+            pull_requests = [
+                PullRequestRecord.from_json(pr, [ReviewRecord.from_json(pr["number"], review) for review in pr_reviews])
+                for pr, pr_reviews in zip(pulls, reviews)
+            ]
+            commits = [CommitRecord.from_json(commit) for commit in commits]
+            issues = [IssueRecord.from_json(issue) for issue in issues]
+            period_metrics = PeriodMetrics()
+            period_metrics.update(commits, pull_requests, issues)
+        except Exception as e:
+            raise ValueError(f"Failed to fetch repository data: {e}")
+
+        return {
+            "repo_name": repo["full_name"],
+            "stargazers_count": repo["stargazers_count"],
+            "forks_count": repo["forks_count"],
+            "open_issues_count": repo["open_issues_count"],
+            "watchers_count": repo["subscribers_count"],
+            "language": repo["language"],
+            "created_at": parse_timestamp(repo["created_at"]),
+            "updated_at": parse_timestamp(repo["updated_at"]),
+            "pushed_at": parse_timestamp(repo["pushed_at"]),
+            "size": repo["size"],
+            "contributors_count": len({commit.author for commit in commits if commit.author}),
+            "labels": [label["name"] for label in labels],
+            "topics": topics["names"],
+            "commits": commits,
+            "pull_requests": pull_requests,
+            "issues": issues,
+            "reviews": [review for pr in pull_requests for review in pr.get_reviews()],
+            "review_index": build_review_index(pull_requests),
+            "period_metrics": period_metrics,
+        }
+
+    def extract_repo_name(self, repo_url):
+        """Extracts the owner/repository from a GitHub URL."""
+        parsed_url = urlparse(repo_url)
+        path_parts = parsed_url.path.strip('/').split('/')
+        if len(path_parts) == 2:
+            owner, repo = path_parts
+            return f"{owner}/{repo}"
+        return None
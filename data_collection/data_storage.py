@@ -1,33 +1,184 @@
+import glob
+import io
+import json
 import os
+import sqlite3
+import threading
+import time
+import uuid
 import pandas as pd
 
+try:
+    import fcntl
+except ImportError:  # Windows: appends stay atomic, but rotation is not coordinated across processes
+    fcntl = None
+
 CSV_FILE_PATH = "repo_metrics.csv"
+DB_FILE_PATH = os.getenv("GITPULSE_METRICS_DB", "repo_metrics.db")
+LOG_FILE_PATH = os.getenv("GITPULSE_METRICS_LOG", "repo_metrics.log")
+COMPACTION_INTERVAL_SECONDS = float(os.getenv("GITPULSE_COMPACTION_INTERVAL", "5"))
+
+def get_connection(db_path=DB_FILE_PATH):
+    """Open the metrics database, creating the indexed table and importing the legacy CSV on first use."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS repo_metrics ("
+        "username TEXT NOT NULL, repo_name TEXT NOT NULL, metrics TEXT NOT NULL, updated_at REAL NOT NULL, "
+        "PRIMARY KEY (username, repo_name))"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS csv_imports (path TEXT PRIMARY KEY, imported_at REAL NOT NULL)")
+    import_csv_data(conn)
+    return conn
 
-def load_csv_data():
+def load_csv_data(csv_path=CSV_FILE_PATH):
     """Load existing CSV data if the file exists, otherwise return an empty DataFrame."""
-    if os.path.exists(CSV_FILE_PATH):
-        return pd.read_csv(CSV_FILE_PATH)
+    if os.path.exists(csv_path):
+        return pd.read_csv(csv_path)
     else:
         # Return an empty dataframe with predefined columns if the file doesn't exist
         return pd.DataFrame(columns=["username", "repo_name", "metrics"])
 
-def store_data_to_csv(username, repo_name, metrics_df):
-    """Store user, repo, and metrics data in the CSV, avoiding duplicates."""
-    # Load existing data
-    df = load_csv_data()
-
-    # Check if the entry already exists (avoiding duplicates)
-    if not ((df["username"] == username) & (df["repo_name"] == repo_name)).any():
-        # If the combination does not exist, append new entry
-        new_entry = {
-            "username": username,
-            "repo_name": repo_name,
-            "metrics": metrics_df.to_json()  # Store the metrics as a JSON string for simplicity
-        }
-        df = df._append(new_entry, ignore_index=True)
-
-        # Save the updated DataFrame back to the CSV
-        df.to_csv(CSV_FILE_PATH, index=False)
-        return f"Data for {repo_name} has been stored successfully."
-    else:
-        return f"Data for {repo_name} already exists in the CSV file."
+def import_csv_data(conn, csv_path=CSV_FILE_PATH):
+    """One-time import of the legacy repo_metrics.csv; rows already in the database are left alone."""
+    if not os.path.exists(csv_path):
+        return 0
+    key = os.path.abspath(csv_path)
+    if conn.execute("SELECT 1 FROM csv_imports WHERE path = ?", (key,)).fetchone():
+        return 0
+    df = load_csv_data(csv_path)
+    imported_at = time.time()
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO repo_metrics (username, repo_name, metrics, updated_at) VALUES (?, ?, ?, ?)",
+            [(row.username, row.repo_name, row.metrics, imported_at) for row in df.itertuples(index=False)],
+        )
+        conn.execute("INSERT INTO csv_imports (path, imported_at) VALUES (?, ?)", (key, imported_at))
+    return len(df)
+
+def _flock(path, mode):
+    """Open and lock a lock file; returns the descriptor, or None if a non-blocking lock is already held."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    if fcntl is None:
+        return fd
+    try:
+        fcntl.flock(fd, mode)
+        return fd
+    except BlockingIOError:
+        os.close(fd)
+        return None
+
+def _unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    os.close(fd)
+
+def store_metrics(username, repo_name, metrics_df):
+    """Record user, repo, and metrics data; a background compactor folds it into the database.
+
+    The record is one line appended to the metrics log with a single O_APPEND write, so
+    concurrent sessions and processes never interleave or lose each other's records. Writers
+    share the log's lock, so they only ever wait for the instant a compactor rotates the log.
+    """
+    record = json.dumps({
+        "username": username,
+        "repo_name": repo_name,
+        # Store the metrics as a JSON string for simplicity
+        "metrics": metrics_df.to_json(),
+        "updated_at": time.time(),
+    }) + "\n"
+    lock_fd = _flock(LOG_FILE_PATH + ".lock", fcntl.LOCK_SH if fcntl else None)
+    try:
+        fd = os.open(LOG_FILE_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            data = record.encode()
+            if os.write(fd, data) != len(data):
+                raise OSError(f"Short write while storing metrics for {repo_name}.")
+        finally:
+            os.close(fd)
+    finally:
+        _unlock(lock_fd)
+    _start_compactor()
+    return f"Data for {repo_name} has been stored successfully."
+
+def compact_metrics_log():
+    """Fold every pending metrics log record into the database; returns the number of records applied.
+
+    Only one compactor runs at a time across processes. The live log is renamed to a
+    .compacting segment while holding the log lock exclusively, so no writer still has it open,
+    and segments left behind by a crashed compactor are picked up again. Upserts only replace
+    older metrics, so replaying a segment is harmless.
+    """
+    compact_fd = _flock(LOG_FILE_PATH + ".compact.lock", fcntl.LOCK_EX | fcntl.LOCK_NB if fcntl else None)
+    if compact_fd is None:
+        return 0
+    try:
+        if os.path.exists(LOG_FILE_PATH):
+            lock_fd = _flock(LOG_FILE_PATH + ".lock", fcntl.LOCK_EX if fcntl else None)
+            try:
+                os.replace(LOG_FILE_PATH, f"{LOG_FILE_PATH}.{uuid.uuid4().hex}.compacting")
+            finally:
+                _unlock(lock_fd)
+
+        applied = 0
+        for segment in sorted(glob.glob(f"{glob.escape(LOG_FILE_PATH)}.*.compacting"), key=os.path.getmtime):
+            with open(segment) as f:
+                # A torn last line can only come from a crashed writer; skip it rather than fail the segment
+                records = []
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+            conn = get_connection()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO repo_metrics (username, repo_name, metrics, updated_at) "
+                        "VALUES (:username, :repo_name, :metrics, :updated_at) "
+                        "ON CONFLICT (username, repo_name) DO UPDATE SET metrics = excluded.metrics, updated_at = excluded.updated_at "
+                        "WHERE excluded.updated_at >= repo_metrics.updated_at",
+                        records,
+                    )
+            finally:
+                conn.close()
+            os.remove(segment)
+            applied += len(records)
+        return applied
+    finally:
+        _unlock(compact_fd)
+
+_compactor = None
+_compactor_lock = threading.Lock()
+
+def _start_compactor():
+    """Start the process's background compaction thread if it is not running yet."""
+    global _compactor
+    with _compactor_lock:
+        if _compactor is None or not _compactor.is_alive():
+            _compactor = threading.Thread(target=_compact_forever, name="gitpulse-metrics-compactor", daemon=True)
+            _compactor.start()
+
+def _compact_forever():
+    while True:
+        time.sleep(COMPACTION_INTERVAL_SECONDS)
+        try:
+            compact_metrics_log()
+        except Exception:
+            # Records stay in the log and are retried on the next pass
+            continue
+
+def load_metrics(username, repo_name):
+    """Look up the stored metrics for a user and repo, or None if they were never stored."""
+    # Fold in pending writes first so a session reads its own updates
+    compact_metrics_log()
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            "SELECT metrics FROM repo_metrics WHERE username = ? AND repo_name = ?", (username, repo_name)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return pd.read_json(io.StringIO(row[0]))
@@ -0,0 +1,41 @@
+import os
+from collections import Counter
+
+# GitHub serves at most 300 events (90 days) per feed, i.e. 3 pages of 100
+EVENT_PAGE_LIMIT = int(os.getenv("GITPULSE_EVENT_PAGES", "3"))
+
+# Event types counted as contributions: commits pushed, issues and pull requests
+CONTRIBUTION_EVENT_TYPES = ("PushEvent", "IssuesEvent", "PullRequestEvent")
+
+
+class EventAggregator:
+    """Counts every event type of a user's public event feed in a single pass.
+
+    Paging stops after max_pages pages, or at the first event older than since, whichever comes
+    first, so the number of requests per profile is bounded up front.
+    """
+
+    def __init__(self, max_pages=EVENT_PAGE_LIMIT, since=None):
+        self.max_pages = max_pages
+        self.since = since
+        self.counts = Counter()
+
+    def consume(self, events):
+        """Reads the paginated event feed (newest first) and returns the per-type breakdown."""
+        for page_number in range(self.max_pages):
+            page = events.get_page(page_number)
+            if not self.add_page((event.type, event.created_at) for event in page) or not page:
+                break
+        return self.breakdown()
+
+    def add_page(self, events):
+        """Counts one page of (type, created_at) events; returns False once the time cutoff is reached."""
+        for event_type, created_at in events:
+            if self.since and created_at < self.since:
+                return False
+            self.counts[event_type] += 1
+        return True
+
+    def breakdown(self):
+        """Returns {event type: count}, most frequent first."""
+        return dict(self.counts.most_common())
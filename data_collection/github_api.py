@@ -1,17 +1,75 @@
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from github import Github
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from urllib.parse import urlparse
+from data_collection.graphql_collector import GRAPHQL_URL, GraphQLDataCollector
+from data_collection.sync_store import SyncStore, merge_by_key
+from data_collection.records import DATASETS, CommitRecord, IssueRecord, PullRequestRecord, ReviewRecord
+from data_collection.review_index import build_review_index
+from metrics.windows import PeriodMetrics
+from data_collection.http_cache import get_http_cache
+from data_collection.rate_limiter import INTERACTIVE, get_scheduler
+from data_collection.language_cache import LanguageCache
+from data_collection.repo_cache import RepoKey
+from data_collection.events import CONTRIBUTION_EVENT_TYPES, EVENT_PAGE_LIMIT, EventAggregator
 
 load_dotenv()
 
+# REST endpoint; GitHub Enterprise serves it under https://<host>/api/v3
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+# Upper bound on concurrent GitHub requests issued by a single collector
+DEFAULT_MAX_WORKERS = int(os.getenv("GITPULSE_MAX_WORKERS", "8"))
+
+# "rest" pages PRs and their reviews through PyGithub; "graphql" fetches both in batched queries
+DEFAULT_BACKEND = os.getenv("GITPULSE_BACKEND", "rest")
+
+# Items per REST page; the largest page GitHub serves
+PAGE_SIZE = 100
+
+# Transport-level retries only; rate-limit responses are left to the request scheduler
+TRANSPORT_RETRY = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
+
+
+def _page_json(item):
+    # PyGithub's raw_data completes list items with a GET to their own URL first; the JSON the
+    # page already delivered holds every field the records need
+    return item._rawData
+
+
 class GitHubDataCollector:
-    def __init__(self):
-        # Load the GitHub access token from the .env file
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, backend=DEFAULT_BACKEND, http_cache=True, priority=INTERACTIVE,
+                 base_url=GITHUB_API_URL, graphql_url=GRAPHQL_URL):
+        # Load the GitHub access token from the .env file; GITHUB_TOKENS may add more tokens to rotate across
         access_token = os.getenv("GITHUB_TOKEN")
         if not access_token:
             raise ValueError("GitHub access token is not set in the .env file.")
-        self.g = Github(access_token)
+        extra_tokens = [token.strip() for token in os.getenv("GITHUB_TOKENS", "").split(",") if token.strip()]
+        tokens = list(dict.fromkeys([access_token] + extra_tokens))
+        self.max_workers = max(max_workers, 1)
+        # Size the connection pool to the worker pool and drop PyGithub's global request spacing,
+        # which would otherwise serialize the workers
+        self.clients = {
+            token: Github(token, base_url=base_url, per_page=PAGE_SIZE, pool_size=self.max_workers,
+                          seconds_between_requests=None, retry=TRANSPORT_RETRY)
+            for token in tokens
+        }
+        if http_cache:
+            # Revalidates GETs with ETags; unchanged resources come back as quota-free 304s
+            for client in self.clients.values():
+                get_http_cache().install(client.requester)
+        # Throttles against X-RateLimit-* and sends each request with the token that has the most quota left
+        get_scheduler().install({token: client.requester for token, client in self.clients.items()}, priority)
+        self.g = self.clients[access_token]
+        if backend not in ("rest", "graphql"):
+            raise ValueError(f"Unknown collector backend: {backend}")
+        self.graphql = GraphQLDataCollector(access_token, url=graphql_url) if backend == "graphql" else None
+        self.sync_store = SyncStore()
+        self.language_cache = LanguageCache()
 
     def get_user_repositories(self, username):
         """Fetches all repositories for a given GitHub user."""
@@ -23,24 +81,22 @@ class GitHubDataCollector:
             raise ValueError(f"Failed to fetch user repositories: {e}")
 
     def get_user_languages(self, username):
-        """Fetches and aggregates the most used languages for a given GitHub user."""
+        """Fetches and aggregates the most used languages for a given GitHub user.
+
+        Only repositories pushed to since their breakdown was cached are re-queried, concurrently.
+        """
         try:
             user = self.g.get_user(username)
-            repos = user.get_repos()
-            language_data = {}
-
-            # Aggregate languages across all repositories
-            for repo in repos:
-                languages = repo.get_languages()
-                for lang, bytes_used in languages.items():
-                    if lang in language_data:
-                        language_data[lang] += bytes_used
-                    else:
-                        language_data[lang] = bytes_used
+            repos = list(user.get_repos())
+            stale = self.language_cache.stale_repositories(username, repos)
 
-            # Sort the languages by usage
-            sorted_languages = sorted(language_data.items(), key=lambda x: x[1], reverse=True)
-            return sorted_languages
+            # One request per changed repository, bounded by the worker pool
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                languages = executor.map(lambda repo: repo.get_languages(), stale)
+                fetched = {repo.full_name: repo_languages for repo, repo_languages in zip(stale, languages)}
+
+            # Sorted by usage, with the totals adjusted only by the repositories that changed
+            return self.language_cache.update(username, repos, fetched)
         except Exception as e:
             raise ValueError(f"Failed to fetch user languages: {e}")
 
@@ -48,7 +104,8 @@ class GitHubDataCollector:
         """Fetches detailed information for a given GitHub username, including languages."""
         try:
             user = self.g.get_user(username)
-            contributions = self.get_contributions(user)
+            event_breakdown = self.get_event_breakdown(user)
+            contributions = self.get_contributions(user, event_breakdown)
             starred_repos_count = user.get_starred().totalCount
             organizations = [org.login for org in user.get_orgs()]
             languages = self.get_user_languages(username)
@@ -66,6 +123,7 @@ class GitHubDataCollector:
                 "following": user.following,
                 "starred_repos": starred_repos_count,
                 "contributions": contributions,
+                "event_breakdown": event_breakdown or {},
                 "organizations": organizations,
                 "created_at": user.created_at.strftime("%Y-%m-%d"),
                 "languages": languages,  # Add languages here
@@ -74,52 +132,284 @@ class GitHubDataCollector:
         except Exception as e:
             raise ValueError(f"Failed to fetch user information: {e}")
     
-    def get_contributions(self, user):
-        """Fetches the number of contributions in the past year (assuming it can be retrieved)."""
+    def get_event_breakdown(self, user, max_pages=EVENT_PAGE_LIMIT, since=None):
+        """Reads the user's public event feed once, up to max_pages pages or back to since, and counts events by type."""
         try:
-            # GitHub API doesn't directly provide contribution data, this would typically require scraping.
-            # We use a workaround here by summing up PRs, commits, and issues.
-            commits_count = sum(1 for _ in user.get_events() if _.type == "PushEvent")
-            issues_count = user.get_issues().totalCount
-            pull_requests_count = sum(1 for _ in user.get_events() if _.type == "PullRequestEvent")
-            
-            total_contributions = commits_count + issues_count + pull_requests_count
-            return total_contributions
+            return EventAggregator(max_pages=max_pages, since=since).consume(user.get_events())
         except Exception:
+            return None
+
+    def get_contributions(self, user, event_breakdown=None):
+        """Fetches the number of contributions in the past year (assuming it can be retrieved)."""
+        # GitHub API doesn't directly provide contribution data, this would typically require scraping.
+        # We use a workaround here by summing up the push, issue and pull request events of the feed.
+        if event_breakdown is None:
+            event_breakdown = self.get_event_breakdown(user)
+        if event_breakdown is None:
             return "Unavailable"
+        return sum(event_breakdown.get(event_type, 0) for event_type in CONTRIBUTION_EVENT_TYPES)
+
+    def get_repo_version(self, repo_url):
+        """Returns the RepoKey of the repository's current version, with a single (conditional) request."""
+        repo_name = self.extract_repo_name(repo_url)
+        if not repo_name:
+            raise ValueError("Invalid GitHub repository URL. Please provide a valid URL.")
+        try:
+            repo = self.g.get_repo(repo_name)
+            return RepoKey(repo.full_name, repo.pushed_at, repo.updated_at)
+        except Exception as e:
+            raise ValueError(f"Failed to fetch repository data: {e}")
+
+    def get_repo_data(self, repo_url, incremental=False, datasets=None):
+        """Collects data for a single repository including commits, PRs, issues, reviews, and additional metadata.
 
-    def get_repo_data(self, repo_url):
-        """Collects data for a single repository including commits, PRs, issues, reviews, and additional metadata."""
+        With incremental=True only commits, issues and PRs newer than the last sync's high-water marks are
+        requested, and they are merged into the history stored by earlier syncs.
+
+        datasets limits the fetch to some of DATASETS (e.g. those metrics.registry.required_datasets names);
+        the others come back as empty lists and repo_data["datasets"] lists what was fetched. A partial
+        fetch is not a complete history, so it neither reads nor advances the incremental sync state.
+        """
         repo_name = self.extract_repo_name(repo_url)
         if not repo_name:
             raise ValueError("Invalid GitHub repository URL. Please provide a valid URL.")
+        datasets = set(DATASETS if datasets is None else datasets)
+        unknown = datasets - set(DATASETS)
+        if unknown:
+            raise ValueError(f"Unknown datasets: {', '.join(sorted(unknown))}")
+        if "reviews" in datasets:
+            datasets.add("pull_requests")
+        incremental = incremental and datasets == set(DATASETS)
 
         try:
             repo = self.g.get_repo(repo_name)
+            snapshot = self.sync_store.load(repo.full_name) if incremental else None
         except Exception as e:
             raise ValueError(f"Failed to fetch repository data: {e}")
+        cursors = snapshot["cursors"] if snapshot else {}
 
-        repo_data = {
-            "repo_name": repo.full_name,
-            "stargazers_count": repo.stargazers_count,
-            "forks_count": repo.forks_count,
-            "open_issues_count": repo.open_issues_count,
-            "watchers_count": repo.subscribers_count,
-            "language": repo.language,
-            "created_at": repo.created_at,
-            "updated_at": repo.updated_at,
-            "pushed_at": repo.pushed_at,
-            "size": repo.size,
-            "contributors_count": repo.get_contributors().totalCount,
-            "labels": [label.name for label in repo.get_labels()],
-            "topics": repo.get_topics(),
-            "commits": list(repo.get_commits()),  # Convert to list
-            "pull_requests": list(repo.get_pulls(state='all')),  # Convert to list
-            "issues": list(repo.get_issues(state='all')),  # Convert to list
-            "reviews": [review for pr in repo.get_pulls(state='all') for review in pr.get_reviews()]
-        }
+        # Independent collections run side by side on a bounded worker pool
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            labels = executor.submit(lambda: [label.name for label in repo.get_labels()])
+            topics = executor.submit(repo.get_topics)
+            commits = executor.submit(self._fetch_commits, repo, cursors.get("commit_date")) if "commits" in datasets else None
+            issues = executor.submit(self._fetch_issues, repo, cursors.get("issues_updated_at")) if "issues" in datasets else None
+            review_futures = {}
+
+            try:
+                if "pull_requests" not in datasets:
+                    pull_requests = []
+                elif self.graphql:
+                    # One query per 100 PRs returns merge state and reviews, so nothing is fetched per PR
+                    pull_requests = self.graphql.get_pull_requests(repo.full_name, updated_since=cursors.get("pulls_updated_at"))
+                elif "reviews" in datasets:
+                    pull_requests = self._fetch_pulls_with_reviews(repo, executor, review_futures, cursors.get("pulls_updated_at"))
+                    for pr in pull_requests:
+                        pr.reviews = review_futures[pr.number].result()
+                else:
+                    # Without reviews the PRs are just a paged list, with no request per PR
+                    pull_requests = [PullRequestRecord.from_json(_page_json(pr)) for pr in repo.get_pulls(state='all')]
+
+                history = {
+                    "commits": commits.result() if commits else [],
+                    "pull_requests": pull_requests,
+                    "issues": issues.result() if issues else [],
+                }
+                if incremental:
+                    history = self._sync_history(repo.full_name, snapshot, history)
+                else:
+                    period_metrics = PeriodMetrics()
+                    period_metrics.update(**history)
+                    history["period_metrics"] = period_metrics
+
+                repo_data = {
+                    "repo_name": repo.full_name,
+                    "stargazers_count": repo.stargazers_count,
+                    "forks_count": repo.forks_count,
+                    "open_issues_count": repo.open_issues_count,
+                    "watchers_count": repo.subscribers_count,
+                    "language": repo.language,
+                    "created_at": repo.created_at,
+                    "updated_at": repo.updated_at,
+                    "pushed_at": repo.pushed_at,
+                    "size": repo.size,
+                    # Distinct commit authors, so the contributors endpoint is not crawled as well
+                    "contributors_count": (
+                        len({commit.author for commit in history["commits"] if commit.author}) if "commits" in datasets else None
+                    ),
+                    "labels": labels.result(),
+                    "topics": topics.result(),
+                    "commits": history["commits"],
+                    "pull_requests": history["pull_requests"],
+                    "issues": history["issues"],
+                    "reviews": [review for pr in history["pull_requests"] for review in pr.get_reviews()],
+                    # Review metrics read this instead of walking the reviews again
+                    "review_index": build_review_index(history["pull_requests"]),
+                    # Weekly, monthly and rolling metrics are derived from its day buckets
+                    "period_metrics": history["period_metrics"],
+                    "datasets": sorted(datasets),
+                }
+            except Exception as e:
+                for future in [labels, topics, commits, issues, *review_futures.values()]:
+                    if future:
+                        future.cancel()
+                raise ValueError(f"Failed to fetch repository data: {e}")
         return repo_data
 
+    # Results are projected into compact records as each page arrives (see data_collection/records.py),
+    # so neither the PyGithub objects nor their raw JSON outlive the fetch
+
+    def _fetch_commits(self, repo, since=None):
+        """Fetches the repository's commits, newest first, optionally only those committed since a date."""
+        commits = repo.get_commits(since=since) if since else repo.get_commits()
+        return [CommitRecord.from_json(_page_json(commit)) for commit in commits]
+
+    def _fetch_issues(self, repo, since=None):
+        """Fetches the repository's issues, optionally only those updated since a date."""
+        if since:
+            issues = repo.get_issues(state='all', since=since, sort='updated', direction='asc')
+        else:
+            issues = repo.get_issues(state='all')
+        return [IssueRecord.from_json(_page_json(issue)) for issue in issues]
+
+    def _fetch_pulls_with_reviews(self, repo, executor, review_futures, updated_since=None):
+        """Pages through the repository's PRs once, queueing each PR's reviews on the pool as its page arrives.
+
+        With updated_since, PRs are walked most recently updated first and paging stops at the first
+        PR that has not changed since then (the pulls endpoint has no since parameter).
+        """
+        pull_requests = []
+        if updated_since:
+            pulls = repo.get_pulls(state='all', sort='updated', direction='desc')
+        else:
+            pulls = repo.get_pulls(state='all')
+        # Runs on the calling thread so the pager never waits behind review jobs for a free worker
+        for pr in pulls:
+            if updated_since and pr.updated_at <= updated_since:
+                break
+            pull_requests.append(PullRequestRecord.from_json(_page_json(pr)))
+            review_futures[pr.number] = executor.submit(
+                lambda pr=pr: [ReviewRecord.from_json(pr.number, _page_json(review)) for review in pr.get_reviews()]
+            )
+        return pull_requests
+
+    def iter_repo_pages(self, repo_url):
+        """Yields (dataset, records) pages of a repository as they are fetched, for streaming metrics.
+
+        The first item is ("repository", {"repo_name"}); after that, pages of
+        "commits", "pull_requests" (reviews attached) and "issues" records arrive interleaved, in
+        whatever order the concurrent fetches complete. At most a few pages are buffered, so memory
+        does not grow with the size of the repository.
+        """
+        repo_name = self.extract_repo_name(repo_url)
+        if not repo_name:
+            raise ValueError("Invalid GitHub repository URL. Please provide a valid URL.")
+        try:
+            repo = self.g.get_repo(repo_name)
+            yield "repository", {"repo_name": repo.full_name}
+        except Exception as e:
+            raise ValueError(f"Failed to fetch repository data: {e}")
+
+        pages = queue.Queue(maxsize=self.max_workers * 2)
+        stop = threading.Event()
+
+        def put(item):
+            # Gives up once the consumer has gone away, so producers never block forever on a full queue
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(dataset, page_iter):
+            try:
+                for page in page_iter:
+                    if not put((dataset, page)):
+                        return
+            except Exception as e:
+                put(("error", e))
+            finally:
+                put((None, None))
+
+        if self.graphql:
+            pull_request_pages = self.graphql.iter_pull_request_pages(repo.full_name)
+        else:
+            pull_request_pages = None
+
+        # Producers get their own threads so they never starve the review fetches queued on the worker pool
+        with ThreadPoolExecutor(max_workers=3) as producers, ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            commit_pages = ([CommitRecord.from_json(_page_json(c)) for c in page] for page in self._iter_pages(repo.get_commits()))
+            issue_pages = ([IssueRecord.from_json(_page_json(i)) for i in page] for page in self._iter_pages(repo.get_issues(state='all')))
+            producers.submit(produce, "commits", commit_pages)
+            producers.submit(produce, "issues", issue_pages)
+            producers.submit(produce, "pull_requests", pull_request_pages or self._iter_pull_request_pages(repo, executor))
+            try:
+                running = 3
+                while running:
+                    dataset, records = pages.get()
+                    if dataset is None:
+                        running -= 1
+                    elif dataset == "error":
+                        raise ValueError(f"Failed to fetch repository data: {records}")
+                    else:
+                        yield dataset, records
+            finally:
+                stop.set()
+
+    @staticmethod
+    def _iter_pages(paginated):
+        """Yields a PyGithub paginated list one page at a time."""
+        page_number = 0
+        while True:
+            page = paginated.get_page(page_number)
+            if page:
+                yield page
+            # A short page is the last one; no need to request the empty page after it
+            if len(page) < PAGE_SIZE:
+                return
+            page_number += 1
+
+    def _iter_pull_request_pages(self, repo, executor):
+        """Yields PR record pages, each with its PRs' reviews fetched in parallel on the worker pool."""
+        for page in self._iter_pages(repo.get_pulls(state='all')):
+            reviews = executor.map(
+                lambda pr: [ReviewRecord.from_json(pr.number, _page_json(review)) for review in pr.get_reviews()], page
+            )
+            yield [PullRequestRecord.from_json(_page_json(pr), pr_reviews) for pr, pr_reviews in zip(page, reviews)]
+
+    def _sync_history(self, repo_name, snapshot, fetched):
+        """Merges a fetch into the stored history, advances the high-water marks and persists both.
+
+        The stored day buckets of the windowed metrics are updated with the fetched items only.
+        """
+        period_metrics = snapshot.get("period_metrics") if snapshot else None
+        if period_metrics is not None:
+            period_metrics.update(**fetched)
+        if snapshot:
+            by_number = lambda item: item.number
+            fetched = {
+                "commits": merge_by_key(snapshot["commits"], fetched["commits"], key=lambda commit: commit.sha),
+                "pull_requests": sorted(merge_by_key(snapshot["pull_requests"], fetched["pull_requests"], key=by_number), key=by_number, reverse=True),
+                "issues": sorted(merge_by_key(snapshot["issues"], fetched["issues"], key=by_number), key=by_number, reverse=True),
+            }
+        commits = fetched["commits"]
+        fetched["cursors"] = {
+            "commit_sha": commits[0].sha if commits else None,
+            # The commits endpoint filters `since` on the committer date
+            "commit_date": max((commit.committed_at for commit in commits), default=None),
+            "issues_updated_at": max((issue.updated_at for issue in fetched["issues"]), default=None),
+            "pulls_updated_at": max((pr.updated_at for pr in fetched["pull_requests"]), default=None),
+        }
+        if period_metrics is None:
+            # First sync, or a snapshot stored before the buckets existed
+            period_metrics = PeriodMetrics()
+            period_metrics.update(commits, fetched["pull_requests"], fetched["issues"])
+        fetched["period_metrics"] = period_metrics
+        self.sync_store.save(repo_name, fetched)
+        return fetched
+
     def extract_repo_name(self, repo_url):
         """Extracts the owner/repository from a GitHub URL."""
         try:
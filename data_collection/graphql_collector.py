@@ -0,0 +1,136 @@
+import os
+import requests
+from data_collection.records import PullRequestRecord, ReviewRecord, parse_timestamp
+
+GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+
+# GitHub's maximum page size for GraphQL connections
+PAGE_SIZE = 100
+
+PULL_REQUESTS_QUERY = """
+query($owner: String!, $name: String!, $cursor: String, $pageSize: Int!, $orderBy: IssueOrderField!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: $pageSize, after: $cursor, orderBy: {field: $orderBy, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        state
+        merged
+        createdAt
+        updatedAt
+        closedAt
+        mergedAt
+        author { login }
+        reviews(first: $pageSize) {
+          pageInfo { hasNextPage endCursor }
+          nodes { author { login } state submittedAt }
+        }
+      }
+    }
+  }
+}
+"""
+
+REVIEWS_QUERY = """
+query($owner: String!, $name: String!, $number: Int!, $cursor: String, $pageSize: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      reviews(first: $pageSize, after: $cursor) {
+        pageInfo { hasNextPage endCursor }
+        nodes { author { login } state submittedAt }
+      }
+    }
+  }
+}
+"""
+
+
+class GraphQLDataCollector:
+    """Fetches pull requests with their merge state and nested reviews through GitHub's GraphQL API."""
+
+    def __init__(self, access_token, url=GRAPHQL_URL):
+        self.url = url
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"bearer {access_token}"})
+
+    def execute(self, query, variables):
+        """Runs a single GraphQL query and returns its data payload."""
+        try:
+            response = self.session.post(self.url, json={"query": query, "variables": variables}, timeout=30)
+            response.raise_for_status()
+            payload = response.json()
+        except Exception as e:
+            raise ValueError(f"GraphQL request failed: {e}")
+        if payload.get("errors"):
+            messages = "; ".join(error.get("message", "") for error in payload["errors"])
+            raise ValueError(f"GraphQL query returned errors: {messages}")
+        return payload["data"]
+
+    def get_pull_requests(self, repo_name, updated_since=None):
+        """Fetches the pull requests of owner/repository in pages of 100 with reviews inlined.
+
+        Without updated_since every PR is returned, newest first. With it, PRs are walked in
+        descending updatedAt order and paging stops at the first one not updated after that time.
+        """
+        return [pr for page in self.iter_pull_request_pages(repo_name, updated_since) for pr in page]
+
+    def iter_pull_request_pages(self, repo_name, updated_since=None):
+        """Yields the pull requests page by page, as get_pull_requests fetches them."""
+        owner, name = repo_name.split("/")
+        order_by = "UPDATED_AT" if updated_since else "CREATED_AT"
+        cursor = None
+        while True:
+            variables = {"owner": owner, "name": name, "cursor": cursor, "pageSize": PAGE_SIZE, "orderBy": order_by}
+            data = self.execute(PULL_REQUESTS_QUERY, variables)
+            connection = data["repository"]["pullRequests"]
+            page = []
+            for node in connection["nodes"]:
+                if updated_since and parse_timestamp(node["updatedAt"]) <= updated_since:
+                    yield page
+                    return
+                reviews = node["reviews"]
+                review_nodes = list(reviews["nodes"])
+                # Only PRs with more than a page of reviews need a follow-up query
+                if reviews["pageInfo"]["hasNextPage"]:
+                    review_nodes += self._get_remaining_reviews(owner, name, node["number"], reviews["pageInfo"]["endCursor"])
+                page.append(self._to_pull_request(node, review_nodes))
+            yield page
+            if not connection["pageInfo"]["hasNextPage"]:
+                return
+            cursor = connection["pageInfo"]["endCursor"]
+
+    def _get_remaining_reviews(self, owner, name, number, cursor):
+        """Pages through the reviews of a single PR starting after the given cursor."""
+        review_nodes = []
+        while cursor:
+            data = self.execute(REVIEWS_QUERY, {"owner": owner, "name": name, "number": number, "cursor": cursor, "pageSize": PAGE_SIZE})
+            reviews = data["repository"]["pullRequest"]["reviews"]
+            review_nodes += reviews["nodes"]
+            cursor = reviews["pageInfo"]["endCursor"] if reviews["pageInfo"]["hasNextPage"] else None
+        return review_nodes
+
+    @staticmethod
+    def _login(node):
+        # Deleted accounts come back as a null author
+        return node["author"]["login"] if node.get("author") else None
+
+    def _to_pull_request(self, node, review_nodes):
+        """Converts a GraphQL pull request node into a PullRequestRecord."""
+        reviews = [
+            ReviewRecord(node["number"], self._login(review), review["state"], parse_timestamp(review["submittedAt"]))
+            for review in review_nodes
+            # Pending reviews have not been submitted yet
+            if review.get("submittedAt")
+        ]
+        return PullRequestRecord(
+            number=node["number"],
+            # REST reports merged PRs as closed; keep the same vocabulary
+            state="open" if node["state"] == "OPEN" else "closed",
+            author=self._login(node),
+            created_at=parse_timestamp(node["createdAt"]),
+            updated_at=parse_timestamp(node["updatedAt"]),
+            closed_at=parse_timestamp(node["closedAt"]),
+            merged_at=parse_timestamp(node["mergedAt"]),
+            merged=node["merged"],
+            reviews=reviews,
+        )
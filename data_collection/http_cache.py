@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+HTTP_CACHE_PATH = os.getenv("GITPULSE_HTTP_CACHE_PATH", os.path.join(".gitpulse_cache", "http_cache.sqlite3"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("GITPULSE_HTTP_CACHE_MB", "256")) * 1024 * 1024
+
+
+class ConditionalRequestCache:
+    """Disk-backed cache of GitHub GET responses revalidated with ETag / Last-Modified.
+
+    GitHub answers a matching If-None-Match or If-Modified-Since with 304 Not Modified, which
+    does not count against the rate limit; the stored body is replayed in its place. Entries are
+    evicted least recently used first once the stored bodies exceed max_bytes.
+    """
+
+    def __init__(self, path=HTTP_CACHE_PATH, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Shared by the collector's worker threads; access is serialized by self.lock
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, headers TEXT, body BLOB, size INTEGER, accessed REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def _key(url, parameters, headers):
+        raw = json.dumps([url, parameters or {}, headers or {}], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key):
+        """Returns (etag, last_modified, headers, body) for a cached response, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, headers, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, headers, body = row
+        return etag, last_modified, json.loads(headers), body
+
+    def touch(self, key):
+        """Marks an entry as recently used so eviction keeps it."""
+        with self.lock:
+            self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+
+    def put(self, key, headers, body):
+        """Stores a response, then evicts the least recently used entries beyond max_bytes."""
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, headers, body, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, headers.get("etag"), headers.get("last-modified"), json.dumps(headers), body, size, time.time()),
+            )
+            self.total_bytes += size - (previous[0] if previous else 0)
+            while self.total_bytes > self.max_bytes:
+                oldest = self.conn.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 64").fetchall()
+                if not oldest:
+                    break
+                for old_key, old_size in oldest:
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                    self.total_bytes -= old_size
+                    if self.total_bytes <= self.max_bytes:
+                        break
+            self.conn.commit()
+
+    def install(self, requester):
+        """Routes the PyGithub requester's GET requests through the cache."""
+        request_json = requester.requestJson
+
+        def cached_request_json(verb, url, parameters=None, headers=None, input=None, cnx=None, follow_302_redirect=False):
+            if verb != "GET" or input is not None:
+                return request_json(verb, url, parameters, headers, input, cnx, follow_302_redirect=follow_302_redirect)
+
+            key = self._key(url, parameters, headers)
+            entry = self.get(key)
+            request_headers = dict(headers or {})
+            if entry:
+                etag, last_modified, _, _ = entry
+                if etag:
+                    request_headers["If-None-Match"] = etag
+                if last_modified:
+                    request_headers["If-Modified-Since"] = last_modified
+
+            status, response_headers, output = request_json(
+                verb, url, parameters, request_headers, input, cnx, follow_302_redirect=follow_302_redirect
+            )
+            if status == 304 and entry:
+                self.touch(key)
+                # Fresh rate-limit headers from the 304 win over the stored ones
+                return 200, {**entry[2], **response_headers}, entry[3]
+            if status == 200 and ("etag" in response_headers or "last-modified" in response_headers):
+                self.put(key, response_headers, output)
+            return status, response_headers, output
+
+        requester.requestJson = cached_request_json
+        return requester
+
+
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_http_cache(path=HTTP_CACHE_PATH):
+    """Returns the process-wide cache for the given path, so every collector shares one connection."""
+    with _shared_caches_lock:
+        if path not in _shared_caches:
+            _shared_caches[path] = ConditionalRequestCache(path)
+        return _shared_caches[path]
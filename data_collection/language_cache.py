@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+
+LANGUAGE_CACHE_PATH = os.getenv("GITPULSE_LANGUAGE_CACHE_PATH", os.path.join(".gitpulse_cache", "languages.json"))
+
+
+class LanguageCache:
+    """Per-user language breakdowns of each repository, keyed on the repository's pushed_at.
+
+    Alongside the breakdowns the cache keeps each user's running byte totals, so a refresh only
+    adjusts the totals by the repositories that were pushed to, added or removed.
+    """
+
+    def __init__(self, path=LANGUAGE_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def _save(self, data):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _version(pushed_at):
+        return pushed_at.isoformat() if pushed_at else None
+
+    def stale_repositories(self, username, repos):
+        """Returns the repositories whose cached breakdown is missing or older than their pushed_at."""
+        with self.lock:
+            cached = self._load().get(username, {}).get("repos", {})
+        return [
+            repo for repo in repos
+            if repo.full_name not in cached or cached[repo.full_name]["pushed_at"] != self._version(repo.pushed_at)
+        ]
+
+    def update(self, username, repos, fetched):
+        """Folds freshly fetched breakdowns into the user's totals and returns the languages sorted by usage.
+
+        :param repos: Every repository the user currently has.
+        :param fetched: {full_name: languages} for the repositories that were re-queried.
+        """
+        with self.lock:
+            data = self._load()
+            entry = data.setdefault(username, {"repos": {}, "totals": {}})
+            cached, totals = entry["repos"], entry["totals"]
+            current = {repo.full_name: repo for repo in repos}
+
+            # Take deleted repositories and outdated breakdowns back out of the totals
+            for full_name in [name for name in cached if name not in current or name in fetched]:
+                for lang, bytes_used in cached.pop(full_name)["languages"].items():
+                    totals[lang] = totals.get(lang, 0) - bytes_used
+
+            for full_name, languages in fetched.items():
+                cached[full_name] = {"pushed_at": self._version(current[full_name].pushed_at), "languages": languages}
+                for lang, bytes_used in languages.items():
+                    totals[lang] = totals.get(lang, 0) + bytes_used
+
+            entry["totals"] = {lang: bytes_used for lang, bytes_used in totals.items() if bytes_used > 0}
+            self._save(data)
+        return sorted(entry["totals"].items(), key=lambda x: x[1], reverse=True)
@@ -0,0 +1,112 @@
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from metrics.registry import metric_names
+
+HISTORY_DIR = os.getenv("GITPULSE_HISTORY_DIR", "metrics_history")
+
+# One typed column per built-in metric (see metric_schema for plugins); snapshots written before a metric
+# existed read back as null
+METRIC_SCHEMA = pa.schema([
+    ("username", pa.string()),
+    ("repo_name", pa.string()),
+    ("snapshot_at", pa.timestamp("us", tz="UTC")),
+    ("commit_frequency", pa.float64()),
+    ("pr_merge_rate", pa.float64()),
+    ("issue_resolution_time", pa.float64()),
+    ("active_days", pa.int64()),
+    ("pr_lead_time", pa.float64()),
+    ("issue_reopen_rate", pa.float64()),
+    ("pr_review_time", pa.float64()),
+    ("time_to_first_review", pa.float64()),
+    ("reviewers_per_pr", pa.float64()),
+    ("bus_factor", pa.int64()),
+    ("issue_resolution_time_p50", pa.float64()),
+    ("issue_resolution_time_p90", pa.float64()),
+    ("issue_resolution_time_p99", pa.float64()),
+    ("pr_lead_time_p50", pa.float64()),
+    ("pr_lead_time_p90", pa.float64()),
+    ("pr_lead_time_p99", pa.float64()),
+    ("pr_review_time_p50", pa.float64()),
+    ("pr_review_time_p90", pa.float64()),
+    ("pr_review_time_p99", pa.float64()),
+    ("distinct_contributors", pa.int64()),
+])
+
+# Snapshots are partitioned by UTC day (metrics_history/date=YYYY-MM-DD/part-*.parquet)
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+
+def metric_schema():
+    """Returns METRIC_SCHEMA plus a float64 column for each registered metric it lacks, e.g. numeric plugin metrics."""
+    extra = [pa.field(name, pa.float64()) for name in metric_names() if name not in METRIC_SCHEMA.names]
+    return pa.schema(list(METRIC_SCHEMA) + extra)
+
+
+def _write_atomically(table, partition_dir):
+    # The dot-prefixed temporary name is skipped by dataset discovery, so readers never see a half-written file
+    name = f"part-{uuid.uuid4().hex}.parquet"
+    tmp_path = os.path.join(partition_dir, f".{name}.tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, os.path.join(partition_dir, name))
+
+
+def append_snapshot(username, metrics_df, snapshot_at=None):
+    """Appends a MetricsCalculator result as a timestamped snapshot in the day's partition."""
+    snapshot_at = snapshot_at or datetime.now(timezone.utc)
+    df = metrics_df.copy()
+    df["username"] = username
+    df["snapshot_at"] = pd.Timestamp(snapshot_at)
+    schema = metric_schema()
+    for field in schema:
+        if field.name not in df.columns:
+            df[field.name] = None
+    table = pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+    partition_dir = os.path.join(HISTORY_DIR, f"date={snapshot_at.strftime('%Y-%m-%d')}")
+    os.makedirs(partition_dir, exist_ok=True)
+    _write_atomically(table, partition_dir)
+
+
+def load_history(metrics=None, since_days=None, repo_names=None):
+    """Scans metric snapshots as a DataFrame, reading only the requested metric columns.
+
+    :param metrics: Metric columns to read, e.g. ["pr_merge_rate"]; all metrics if None.
+    :param since_days: Only snapshots from the last N days; older date partitions are skipped unread.
+    :param repo_names: Only snapshots of these repositories.
+    """
+    if not os.path.isdir(HISTORY_DIR):
+        return pd.DataFrame(columns=["username", "repo_name", "snapshot_at"] + (metrics or []))
+    schema = metric_schema()
+    dataset = ds.dataset(HISTORY_DIR, format="parquet", schema=schema.append(pa.field("date", pa.string())),
+                         partitioning=PARTITIONING)
+    columns = ["username", "repo_name", "snapshot_at"] + (metrics or schema.names[3:])
+
+    condition = None
+    if since_days is not None:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=since_days)
+        snapshot_cutoff = pa.scalar(cutoff, METRIC_SCHEMA.field("snapshot_at").type)
+        condition = (ds.field("date") >= cutoff.strftime("%Y-%m-%d")) & (ds.field("snapshot_at") >= snapshot_cutoff)
+    if repo_names is not None:
+        repo_condition = ds.field("repo_name").isin(list(repo_names))
+        condition = repo_condition if condition is None else condition & repo_condition
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+
+def compact_partition(date):
+    """Rewrites one day's snapshot files as a single file, so scans open one file per day."""
+    partition_dir = os.path.join(HISTORY_DIR, f"date={date}")
+    parts = [os.path.join(partition_dir, name) for name in os.listdir(partition_dir) if name.endswith(".parquet")]
+    if len(parts) < 2:
+        return
+    schema = metric_schema()
+    table = pa.concat_tables(pq.read_table(part, schema=schema) for part in parts)
+    _write_atomically(table, partition_dir)
+    for part in parts:
+        os.remove(part)
@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+
+# Request priorities; interactive requests (UI clicks) always go ahead of background refreshes
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Below this share of a token's hourly quota, requests are spread evenly over the rest of the window;
+# above it they are sent as soon as they are made
+PACING_RESERVE = float(os.getenv("GITPULSE_PACING_RESERVE", "0.05"))
+# Share of each token's hourly quota that background requests leave for interactive ones
+BACKGROUND_RESERVE = float(os.getenv("GITPULSE_BACKGROUND_RESERVE", "0.2"))
+# Longest an interactive request waits for quota before it is sent anyway and left to fail
+MAX_WAIT_SECONDS = float(os.getenv("GITPULSE_MAX_RATE_WAIT", "120"))
+# Retries after a secondary rate limit; the first back-off is a minute, as GitHub asks
+MAX_RETRIES = 3
+SECONDARY_BACKOFF_SECONDS = 60
+
+
+class TokenState:
+    """Quota bookkeeping for one access token, corrected from X-RateLimit-* response headers.
+
+    Requests in flight are counted against the quota until their response reports the real
+    remaining count, so a response GitHub did not charge for (a 304 revalidation) costs nothing.
+    """
+
+    def __init__(self, limit=5000):
+        self.limit = limit
+        self.remaining = limit
+        self.reset_at = time.time() + 3600
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.last_paced = 0.0
+
+    @property
+    def available(self):
+        return self.remaining - self.in_flight
+
+    def roll_over(self, now):
+        if now >= self.reset_at:
+            # The window rolled over without a response telling us so; assume a full quota until one does
+            self.remaining = self.limit
+            self.reset_at = now + 3600
+
+    def seconds_until_available(self, now, pacing_reserve=PACING_RESERVE):
+        """Returns how long the next request has to wait: nothing while the quota is comfortably above the reserve."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.available <= 0:
+            return self.reset_at - now
+        if self.available > self.limit * pacing_reserve:
+            return 0.0
+        # Close to the reserve: what is left is spread evenly until the window resets
+        interval = max(self.reset_at - now, 0.0) / self.available
+        return max(self.last_paced + interval - now, 0.0)
+
+
+class RequestScheduler:
+    """Sends GitHub requests against each token's rate limit, prioritising interactive requests.
+
+    The scheduler is installed under one or more PyGithub requesters (one per token). Each request
+    is sent with whichever token has the most quota left. Requests go out immediately while a token
+    has plenty of quota and are only paced once it nears its last PACING_RESERVE share. Background
+    requests wait while interactive ones are queued or once a token is down to its background
+    reserve, and secondary rate limits are retried after a back-off instead of surfacing as errors.
+    """
+
+    def __init__(self, background_reserve=BACKGROUND_RESERVE, max_wait=MAX_WAIT_SECONDS, pacing_reserve=PACING_RESERVE):
+        self.background_reserve = background_reserve
+        self.pacing_reserve = pacing_reserve
+        self.max_wait = max_wait
+        self.states = {}
+        self.condition = threading.Condition()
+        self.waiting_interactive = 0
+
+    def _state(self, token):
+        if token not in self.states:
+            self.states[token] = TokenState()
+        return self.states[token]
+
+    def _blocked(self, state, priority):
+        # Background requests leave the last share of each token's quota to interactive ones
+        return priority == BACKGROUND and state.available <= state.limit * self.background_reserve
+
+    def _send(self, state, now):
+        if state.available <= state.limit * self.pacing_reserve:
+            state.last_paced = now
+        state.in_flight += 1
+
+    def acquire(self, tokens, priority=INTERACTIVE):
+        """Blocks until one of the tokens may send a request and returns it; pair with release().
+
+        Interactive requests give up waiting after max_wait and are sent with the best token anyway;
+        background requests wait for as long as it takes.
+        """
+        deadline = time.time() + self.max_wait if priority == INTERACTIVE else None
+        with self.condition:
+            if priority == INTERACTIVE:
+                self.waiting_interactive += 1
+            try:
+                while True:
+                    now = time.time()
+                    states = sorted(((self._state(token), token) for token in tokens), key=lambda s: -s[0].available)
+                    for state, _ in states:
+                        state.roll_over(now)
+                    if deadline is not None and now >= deadline:
+                        state, token = states[0]
+                        self._send(state, now)
+                        return token
+                    # Background work yields to any queued interactive request
+                    if priority == INTERACTIVE or self.waiting_interactive == 0:
+                        for state, token in states:
+                            if not self._blocked(state, priority) and state.seconds_until_available(now, self.pacing_reserve) <= 0:
+                                self._send(state, now)
+                                return token
+                    wait = min(
+                        state.reset_at - now if self._blocked(state, priority)
+                        else state.seconds_until_available(now, self.pacing_reserve)
+                        for state, _ in states
+                    )
+                    if deadline is not None:
+                        wait = min(wait, deadline - now)
+                    self.condition.wait(timeout=max(wait, 0.05))
+            finally:
+                if priority == INTERACTIVE:
+                    self.waiting_interactive -= 1
+                    self.condition.notify_all()
+
+    def release(self, token, headers, retry_after=None):
+        """Ends a request sent with acquire(), replacing the local quota estimate with what GitHub reported."""
+        with self.condition:
+            state = self._state(token)
+            state.in_flight = max(state.in_flight - 1, 0)
+            if retry_after:
+                # Every request on this token waits out the back-off, not just the one that was told to
+                state.blocked_until = max(state.blocked_until, time.time() + retry_after)
+            self._update(state, headers)
+            self.condition.notify_all()
+
+    def update(self, token, headers):
+        """Replaces the local quota estimate with what GitHub reported."""
+        with self.condition:
+            self._update(self._state(token), headers)
+            self.condition.notify_all()
+
+    @staticmethod
+    def _update(state, headers):
+        if "x-ratelimit-remaining" not in headers:
+            return
+        state.limit = int(headers.get("x-ratelimit-limit", state.limit))
+        state.remaining = int(headers["x-ratelimit-remaining"])
+        state.reset_at = float(headers.get("x-ratelimit-reset", state.reset_at))
+
+    @staticmethod
+    def _retry_delay(status, headers, output, attempt):
+        """Returns how long to back off before retrying a rate-limited response, or None if it should not be retried."""
+        if status not in (403, 429):
+            return None
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+        if headers.get("x-ratelimit-remaining") == "0":
+            # Primary limit: retry straight away, acquire() picks another token or waits for the reset
+            return 0.0
+        body = output.decode(errors="replace") if isinstance(output, bytes) else str(output)
+        if "secondary rate limit" in body.lower():
+            return SECONDARY_BACKOFF_SECONDS * 2 ** attempt
+        return None
+
+    def install(self, requesters, priority=INTERACTIVE):
+        """Routes every request of the given {token: requester} pool through the scheduler."""
+        request_json = {token: requester.requestJson for token, requester in requesters.items()}
+
+        def scheduled_request_json(verb, url, parameters=None, headers=None, input=None, cnx=None, follow_302_redirect=False):
+            attempt = 0
+            while True:
+                token = self.acquire(list(request_json), priority)
+                try:
+                    status, response_headers, output = request_json[token](
+                        verb, url, parameters, headers, input, cnx, follow_302_redirect=follow_302_redirect
+                    )
+                except Exception:
+                    self.release(token, {})
+                    raise
+                delay = self._retry_delay(status, response_headers, output, attempt)
+                self.release(token, response_headers, retry_after=delay)
+                if delay is None or attempt >= MAX_RETRIES:
+                    return status, response_headers, output
+                attempt += 1
+                # Waits for the back-off in acquire(), alongside every other request on the token
+
+        for requester in requesters.values():
+            requester.requestJson = scheduled_request_json
+
+
+_shared_scheduler = RequestScheduler()
+
+
+def get_scheduler():
+    """Returns the process-wide scheduler, so every collector draws on the same per-token quota."""
+    return _shared_scheduler
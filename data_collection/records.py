@@ -0,0 +1,123 @@
+from datetime import datetime
+
+
+# The raw collections get_repo_data can fetch; reviews are fetched per pull request
+DATASETS = ("commits", "pull_requests", "reviews", "issues")
+
+
+def parse_timestamp(value):
+    """Parses a GitHub ISO-8601 timestamp (e.g. 2024-01-31T12:00:00Z) into an aware datetime."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _login(user):
+    # Deleted accounts and commits by unlinked emails come back without a user
+    return user["login"] if user else None
+
+
+class CommitRecord:
+    """A commit holding only the fields the metrics use."""
+    __slots__ = ("sha", "author", "date", "committed_at")
+
+    def __init__(self, sha, author, date, committed_at):
+        self.sha = sha
+        self.author = author
+        self.date = date
+        self.committed_at = committed_at
+
+    @classmethod
+    def from_json(cls, data):
+        """Projects a REST commit payload; the author falls back to the git author name when unlinked."""
+        git_commit = data["commit"]
+        return cls(
+            sha=data["sha"],
+            author=_login(data.get("author")) or git_commit["author"]["name"],
+            date=parse_timestamp(git_commit["author"]["date"]),
+            committed_at=parse_timestamp(git_commit["committer"]["date"]),
+        )
+
+
+class IssueRecord:
+    """An issue (or the issue side of a pull request) holding only the fields the metrics use."""
+    __slots__ = ("number", "state", "author", "created_at", "updated_at", "closed_at", "thumbs_up", "is_pull_request")
+
+    def __init__(self, number, state, author, created_at, updated_at, closed_at, thumbs_up, is_pull_request):
+        self.number = number
+        self.state = state
+        self.author = author
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.closed_at = closed_at
+        self.thumbs_up = thumbs_up
+        self.is_pull_request = is_pull_request
+
+    @classmethod
+    def from_json(cls, data):
+        """Projects a REST issue payload."""
+        return cls(
+            number=data["number"],
+            state=data["state"],
+            author=_login(data.get("user")),
+            created_at=parse_timestamp(data["created_at"]),
+            updated_at=parse_timestamp(data["updated_at"]),
+            closed_at=parse_timestamp(data.get("closed_at")),
+            thumbs_up=data.get("reactions", {}).get("+1", 0),
+            is_pull_request="pull_request" in data,
+        )
+
+
+class ReviewRecord:
+    """A pull request review holding only the fields the metrics use."""
+    __slots__ = ("pr_number", "author", "state", "submitted_at")
+
+    def __init__(self, pr_number, author, state, submitted_at):
+        self.pr_number = pr_number
+        self.author = author
+        self.state = state
+        self.submitted_at = submitted_at
+
+    @classmethod
+    def from_json(cls, pr_number, data):
+        """Projects a REST review payload of the given pull request."""
+        return cls(pr_number, _login(data.get("user")), data["state"], parse_timestamp(data.get("submitted_at")))
+
+
+class PullRequestRecord:
+    """A pull request with its merge state, timestamps and reviews already resolved."""
+    __slots__ = ("number", "state", "author", "created_at", "updated_at", "closed_at", "merged_at", "merged", "reviews")
+
+    def __init__(self, number, state, author, created_at, updated_at, closed_at, merged_at, merged, reviews=()):
+        self.number = number
+        self.state = state
+        self.author = author
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.closed_at = closed_at
+        self.merged_at = merged_at
+        self.merged = merged
+        self.reviews = list(reviews)
+
+    @classmethod
+    def from_json(cls, data, reviews=()):
+        """Projects a REST pull request payload.
+
+        List payloads carry merged_at but not merged, and reading PyGithub's merged on them costs a
+        request per PR, so merged is derived from merged_at.
+        """
+        return cls(
+            number=data["number"],
+            state=data["state"],
+            author=_login(data.get("user")),
+            created_at=parse_timestamp(data["created_at"]),
+            updated_at=parse_timestamp(data["updated_at"]),
+            closed_at=parse_timestamp(data.get("closed_at")),
+            merged_at=parse_timestamp(data.get("merged_at")),
+            merged=data.get("merged_at") is not None,
+            reviews=reviews,
+        )
+
+    def get_reviews(self):
+        """Returns the reviews fetched alongside the pull request, without another API call."""
+        return self.reviews
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict, namedtuple
+
+REPO_CACHE_DIR = os.getenv("GITPULSE_REPO_CACHE_DIR", os.path.join(".gitpulse_cache", "repo_data"))
+REPO_CACHE_MEMORY_BYTES = int(os.getenv("GITPULSE_REPO_CACHE_MEMORY_MB", "256")) * 1024 * 1024
+
+# Bumped whenever the cached payload layout changes; older entries are treated as misses
+CACHE_VERSION = 5
+
+# Identifies one version of a repository: any push or metadata change gives a new key
+RepoKey = namedtuple("RepoKey", ["full_name", "pushed_at", "updated_at"])
+
+
+def repo_key(repo_data):
+    """Returns the RepoKey of a get_repo_data result."""
+    return RepoKey(repo_data["repo_name"], repo_data["pushed_at"], repo_data["updated_at"])
+
+
+class RepoDataCache:
+    """Two-tier cache of per-repository results, keyed on the repository's version.
+
+    A byte-bounded in-memory LRU sits in front of pickles on disk, so hits are served without
+    touching GitHub and survive restarts and other processes. Entries never expire on a timer:
+    a push or metadata change yields a new RepoKey, and the stale entries simply stop matching.
+    """
+
+    def __init__(self, base_dir=REPO_CACHE_DIR, max_memory_bytes=REPO_CACHE_MEMORY_BYTES):
+        self.base_dir = base_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # (kind, key) -> (value, size), least recently used first
+        self.memory_bytes = 0
+
+    def _path(self, kind, key):
+        digest = hashlib.sha256(repr((CACHE_VERSION, kind, tuple(key))).encode()).hexdigest()
+        return os.path.join(self.base_dir, key.full_name.replace("/", "__"), f"{kind}-{digest}.pkl")
+
+    def get(self, kind, key):
+        """Returns the cached value of a kind (e.g. "repo_data" or "metrics") for a RepoKey, or None."""
+        with self.lock:
+            entry = self.entries.get((kind, key))
+            if entry is not None:
+                self.entries.move_to_end((kind, key))
+                return entry[0]
+        path = self._path(kind, key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            payload = f.read()
+        value = pickle.loads(payload)
+        self._remember(kind, key, value, len(payload))
+        return value
+
+    def put(self, kind, key, value):
+        """Caches a value in memory and writes it to disk, replacing older versions of the repository."""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        path = self._path(kind, key)
+        repo_dir = os.path.dirname(path)
+        os.makedirs(repo_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        # Older versions can never be hit again, so they are dropped rather than left for eviction
+        for name in os.listdir(repo_dir):
+            if name.startswith(f"{kind}-") and name.endswith(".pkl") and name != os.path.basename(path):
+                try:
+                    os.remove(os.path.join(repo_dir, name))
+                except FileNotFoundError:
+                    pass
+        with self.lock:
+            for stale in [k for k in self.entries if k[0] == kind and k[1].full_name == key.full_name and k[1] != key]:
+                self.memory_bytes -= self.entries.pop(stale)[1]
+        self._remember(kind, key, value, len(payload))
+
+    def _remember(self, kind, key, value, size):
+        # The pickled size stands in for the in-memory footprint
+        if size > self.max_memory_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop((kind, key), None)
+            if previous is not None:
+                self.memory_bytes -= previous[1]
+            self.entries[(kind, key)] = (value, size)
+            self.memory_bytes += size
+            while self.memory_bytes > self.max_memory_bytes:
+                _, (_, old_size) = self.entries.popitem(last=False)
+                self.memory_bytes -= old_size
+
+
+_repo_cache = None
+_repo_cache_lock = threading.Lock()
+
+
+def get_repo_cache():
+    """Returns the process-wide cache, so every session shares one memory budget."""
+    global _repo_cache
+    with _repo_cache_lock:
+        if _repo_cache is None:
+            _repo_cache = RepoDataCache()
+        return _repo_cache
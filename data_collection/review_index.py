@@ -0,0 +1,33 @@
+class ReviewSummary:
+    """What the metrics need to know about one pull request's reviews, without the reviews themselves."""
+    __slots__ = ("pr_number", "created_at", "first_review_at", "review_count", "reviewers", "review_days")
+
+    def __init__(self, pr_number, created_at, first_review_at=None, review_count=0, reviewers=frozenset(), review_days=0):
+        self.pr_number = pr_number
+        self.created_at = created_at
+        self.first_review_at = first_review_at
+        self.review_count = review_count
+        self.reviewers = reviewers
+        # Sum over the reviews of the whole days from the PR being opened to the review
+        self.review_days = review_days
+
+    @classmethod
+    def from_pull_request(cls, pr):
+        # Pending reviews have no submission time yet and are not counted
+        submitted = [review for review in pr.get_reviews() if review.submitted_at is not None]
+        return cls(
+            pr_number=pr.number,
+            created_at=pr.created_at,
+            first_review_at=min((review.submitted_at for review in submitted), default=None),
+            review_count=len(submitted),
+            reviewers=frozenset(review.author for review in submitted if review.author),
+            review_days=sum((review.submitted_at - pr.created_at).days for review in submitted),
+        )
+
+
+def build_review_index(pull_requests):
+    """Indexes the reviews already attached to the pull requests by PR number, one ReviewSummary each.
+
+    Every pull request gets an entry, reviewed or not, so per-PR averages cover all of them.
+    """
+    return {pr.number: ReviewSummary.from_pull_request(pr) for pr in pull_requests}
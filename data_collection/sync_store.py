@@ -0,0 +1,52 @@
+import os
+import pickle
+
+SYNC_DIR = os.getenv("GITPULSE_SYNC_DIR", ".gitpulse_sync")
+
+# Bumped whenever the stored record layout changes; older snapshots are re-synced from scratch
+SNAPSHOT_VERSION = 2
+
+
+class SyncStore:
+    """Persists, per repository, the history fetched so far and the high-water marks of the last sync."""
+
+    def __init__(self, base_dir=SYNC_DIR):
+        self.base_dir = base_dir
+
+    def _path(self, repo_name):
+        return os.path.join(self.base_dir, repo_name.replace("/", "__") + ".pkl")
+
+    def load(self, repo_name):
+        """Returns the stored snapshot for owner/repository, or None if it was never synced."""
+        path = self._path(repo_name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+        return snapshot
+
+    def save(self, repo_name, snapshot):
+        """Writes the snapshot atomically, so a crashed sync never leaves a truncated file behind."""
+        os.makedirs(self.base_dir, exist_ok=True)
+        path = self._path(repo_name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({**snapshot, "version": SNAPSHOT_VERSION}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+
+def merge_by_key(history, updates, key):
+    """Merges freshly fetched items into the stored history, newer copies replacing older ones.
+
+    Updates are placed first, so a newest-first history stays newest-first.
+    """
+    seen = set()
+    merged = []
+    for item in list(updates) + list(history):
+        item_key = key(item)
+        if item_key not in seen:
+            seen.add(item_key)
+            merged.append(item)
+    return merged
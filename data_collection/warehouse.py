@@ -0,0 +1,236 @@
+import json
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+from data_collection.records import CommitRecord, IssueRecord, PullRequestRecord, ReviewRecord
+from data_collection.review_index import build_review_index
+from metrics.windows import PeriodMetrics
+
+WAREHOUSE_PATH = os.getenv("GITPULSE_WAREHOUSE_PATH", "activity_warehouse.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repositories (
+    repo_name TEXT PRIMARY KEY, stargazers_count INTEGER, forks_count INTEGER, open_issues_count INTEGER,
+    watchers_count INTEGER, language TEXT, created_at TEXT, updated_at TEXT, pushed_at TEXT, size INTEGER,
+    contributors_count INTEGER, labels TEXT, topics TEXT, synced_at REAL
+);
+CREATE TABLE IF NOT EXISTS commits (
+    repo_name TEXT NOT NULL, sha TEXT NOT NULL, author TEXT, date TEXT, committed_at TEXT,
+    PRIMARY KEY (repo_name, sha)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pull_requests (
+    repo_name TEXT NOT NULL, number INTEGER NOT NULL, state TEXT, author TEXT, created_at TEXT, updated_at TEXT,
+    closed_at TEXT, merged_at TEXT, merged INTEGER,
+    PRIMARY KEY (repo_name, number)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS issues (
+    repo_name TEXT NOT NULL, number INTEGER NOT NULL, state TEXT, author TEXT, created_at TEXT, updated_at TEXT,
+    closed_at TEXT, thumbs_up INTEGER, is_pull_request INTEGER,
+    PRIMARY KEY (repo_name, number)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reviews (
+    repo_name TEXT NOT NULL, pr_number INTEGER NOT NULL, seq INTEGER NOT NULL, author TEXT, state TEXT, submitted_at TEXT,
+    PRIMARY KEY (repo_name, pr_number, seq)
+) WITHOUT ROWID;
+"""
+
+REPOSITORY_FIELDS = (
+    "stargazers_count", "forks_count", "open_issues_count", "watchers_count", "language",
+    "created_at", "updated_at", "pushed_at", "size", "contributors_count",
+)
+
+
+def _dump(value):
+    # Timestamps are kept as ISO-8601 text, which sorts chronologically
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _load(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _epoch(column):
+    # SQL expression for an ISO-8601 column as UTC epoch seconds (NULL stays NULL)
+    return f"round((julianday({column}) - 2440587.5) * 86400.0, 6)"
+
+
+class ActivityWarehouse:
+    """Local SQLite store of the raw commits, pull requests, issues and reviews of each repository.
+
+    Everything MetricsCalculator reads is kept, keyed by repository and id, so metrics can be
+    recomputed offline after MetricsDefinitions changes instead of re-crawling GitHub.
+    """
+
+    def __init__(self, path=WAREHOUSE_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def save_repo_data(self, repo_data):
+        """Upserts a get_repo_data result; items already stored for the repository are replaced by id."""
+        repo_name = repo_data["repo_name"]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO repositories (repo_name, {', '.join(REPOSITORY_FIELDS)}, labels, topics, synced_at) "
+                    f"VALUES ({', '.join('?' * (len(REPOSITORY_FIELDS) + 4))})",
+                    (repo_name, *(_dump(repo_data[field]) for field in REPOSITORY_FIELDS),
+                     json.dumps(repo_data["labels"]), json.dumps(repo_data["topics"]), time.time()),
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?, ?)",
+                    ((repo_name, c.sha, c.author, _dump(c.date), _dump(c.committed_at)) for c in repo_data["commits"]),
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO pull_requests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((repo_name, pr.number, pr.state, pr.author, _dump(pr.created_at), _dump(pr.updated_at),
+                      _dump(pr.closed_at), _dump(pr.merged_at), int(pr.merged)) for pr in repo_data["pull_requests"]),
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((repo_name, i.number, i.state, i.author, _dump(i.created_at), _dump(i.updated_at),
+                      _dump(i.closed_at), i.thumbs_up, int(i.is_pull_request)) for i in repo_data["issues"]),
+                )
+                # A PR's reviews are replaced as a whole, since reviews carry no id of their own
+                conn.executemany(
+                    "DELETE FROM reviews WHERE repo_name = ? AND pr_number = ?",
+                    ((repo_name, pr.number) for pr in repo_data["pull_requests"]),
+                )
+                conn.executemany(
+                    "INSERT INTO reviews VALUES (?, ?, ?, ?, ?, ?)",
+                    ((repo_name, pr.number, seq, r.author, r.state, _dump(r.submitted_at))
+                     for pr in repo_data["pull_requests"] for seq, r in enumerate(pr.get_reviews())),
+                )
+        finally:
+            conn.close()
+
+    def repo_names(self):
+        """Returns the names of every stored repository."""
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute("SELECT repo_name FROM repositories ORDER BY repo_name")]
+        finally:
+            conn.close()
+
+    def load_repo_data(self, repo_name):
+        """Rebuilds a get_repo_data-shaped dict for a stored repository, without touching the network."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                f"SELECT {', '.join(REPOSITORY_FIELDS)}, labels, topics FROM repositories WHERE repo_name = ?", (repo_name,)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Repository {repo_name} is not in the activity warehouse.")
+            repo_data = {"repo_name": repo_name, **dict(zip(REPOSITORY_FIELDS, row))}
+            for field in ("created_at", "updated_at", "pushed_at"):
+                repo_data[field] = _load(repo_data[field])
+            repo_data["labels"], repo_data["topics"] = json.loads(row[-2]), json.loads(row[-1])
+
+            reviews = defaultdict(list)
+            for pr_number, author, state, submitted_at in conn.execute(
+                "SELECT pr_number, author, state, submitted_at FROM reviews WHERE repo_name = ? ORDER BY pr_number, seq", (repo_name,)
+            ):
+                reviews[pr_number].append(ReviewRecord(pr_number, author, state, _load(submitted_at)))
+
+            # Same order the API returns: newest commits and highest numbers first
+            repo_data["commits"] = [
+                CommitRecord(sha, author, _load(date), _load(committed_at))
+                for sha, author, date, committed_at in conn.execute(
+                    "SELECT sha, author, date, committed_at FROM commits WHERE repo_name = ? ORDER BY committed_at DESC", (repo_name,)
+                )
+            ]
+            repo_data["pull_requests"] = [
+                PullRequestRecord(number, state, author, _load(created_at), _load(updated_at), _load(closed_at),
+                                  _load(merged_at), bool(merged), reviews.get(number, ()))
+                for number, state, author, created_at, updated_at, closed_at, merged_at, merged in conn.execute(
+                    "SELECT number, state, author, created_at, updated_at, closed_at, merged_at, merged "
+                    "FROM pull_requests WHERE repo_name = ? ORDER BY number DESC", (repo_name,)
+                )
+            ]
+            repo_data["issues"] = [
+                IssueRecord(number, state, author, _load(created_at), _load(updated_at), _load(closed_at), thumbs_up, bool(is_pr))
+                for number, state, author, created_at, updated_at, closed_at, thumbs_up, is_pr in conn.execute(
+                    "SELECT number, state, author, created_at, updated_at, closed_at, thumbs_up, is_pull_request "
+                    "FROM issues WHERE repo_name = ? ORDER BY number DESC", (repo_name,)
+                )
+            ]
+            repo_data["reviews"] = [review for pr in repo_data["pull_requests"] for review in pr.get_reviews()]
+            repo_data["review_index"] = build_review_index(repo_data["pull_requests"])
+            repo_data["period_metrics"] = PeriodMetrics()
+            repo_data["period_metrics"].update(repo_data["commits"], repo_data["pull_requests"], repo_data["issues"])
+            return repo_data
+        finally:
+            conn.close()
+
+    def author_commit_counts(self, repo_name):
+        """Returns the number of stored commits of each author of a repository."""
+        conn = self._connect()
+        try:
+            return dict(conn.execute(
+                "SELECT author, COUNT(*) FROM commits WHERE repo_name = ? AND author IS NOT NULL GROUP BY author", (repo_name,)
+            ))
+        finally:
+            conn.close()
+
+    def load_activity_columns(self, repo_name):
+        """Reads a stored repository's activity as NumPy columns, timestamps as epoch seconds (NaN if missing).
+
+        The keys match MetricsEngine's constructor. Timestamps are converted inside SQLite, so no
+        datetime or record objects are built.
+        """
+        conn = self._connect()
+        try:
+            if conn.execute("SELECT 1 FROM repositories WHERE repo_name = ?", (repo_name,)).fetchone() is None:
+                raise ValueError(f"Repository {repo_name} is not in the activity warehouse.")
+            # Rows load straight into float arrays, where NULL becomes NaN
+            commit_dates = np.array(conn.execute(
+                f"SELECT {_epoch('date')} FROM commits WHERE repo_name = ?", (repo_name,)
+            ).fetchall(), dtype=float).reshape(-1)
+            pull_requests = np.array(conn.execute(
+                f"SELECT p.number, {_epoch('p.created_at')}, {_epoch('p.merged_at')}, p.merged, "
+                f"{_epoch('r.first_review_at')}, COALESCE(r.reviewers, 0) FROM pull_requests p "
+                "LEFT JOIN (SELECT pr_number, MIN(submitted_at) AS first_review_at, COUNT(DISTINCT author) AS reviewers "
+                "FROM reviews WHERE repo_name = ? AND submitted_at IS NOT NULL GROUP BY pr_number) r ON r.pr_number = p.number "
+                "WHERE p.repo_name = ? ORDER BY p.number",
+                (repo_name, repo_name),
+            ).fetchall(), dtype=float).reshape(-1, 6)
+            reviews = np.array(conn.execute(
+                f"SELECT pr_number, {_epoch('submitted_at')} FROM reviews WHERE repo_name = ?", (repo_name,)
+            ).fetchall(), dtype=float).reshape(-1, 2)
+            # Pull requests are sorted by number, so each review finds its PR's row by binary search
+            review_pr_rows = np.searchsorted(pull_requests[:, 0], reviews[:, 0])
+            issues = np.array(conn.execute(
+                f"SELECT {_epoch('created_at')}, {_epoch('closed_at')}, state = 'closed', thumbs_up FROM issues WHERE repo_name = ?",
+                (repo_name,),
+            ).fetchall(), dtype=float).reshape(-1, 4)
+            return {
+                "commit_dates": commit_dates,
+                "pr_created": pull_requests[:, 1],
+                "pr_merged_at": pull_requests[:, 2],
+                "pr_merged": pull_requests[:, 3].astype(bool),
+                "pr_first_review": pull_requests[:, 4],
+                "pr_reviewer_count": pull_requests[:, 5].astype(np.int64),
+                "review_submitted": reviews[:, 1],
+                "review_pr_created": pull_requests[review_pr_rows, 1],
+                "issue_created": issues[:, 0],
+                "issue_closed_at": issues[:, 1],
+                "issue_closed": issues[:, 2].astype(bool),
+                "issue_thumbs_up": issues[:, 3].astype(np.int64),
+                "contributors": [row[0] for row in conn.execute(
+                    "SELECT author FROM commits WHERE repo_name = ?1 UNION SELECT author FROM pull_requests WHERE repo_name = ?1 "
+                    "UNION SELECT author FROM reviews WHERE repo_name = ?1", (repo_name,)
+                )],
+            }
+        finally:
+            conn.close()
@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from data_collection.github_api import GitHubDataCollector
+from data_collection.rate_limiter import BACKGROUND
+from data_collection.records import DATASETS
+from data_collection.repo_cache import get_repo_cache, repo_key
+from data_collection.warehouse import ActivityWarehouse
+from metrics.calculator import MetricsCalculator
+from metrics.sketches import RepoSketches
+
+# Worker processes for batch runs; each one also fetches with its own thread pool
+DEFAULT_BATCH_PROCESSES = int(os.getenv("GITPULSE_BATCH_PROCESSES", str(min(4, os.cpu_count() or 1))))
+
+
+def fetch_repository_data(repo_name, data_collector=None, datasets=None):
+    """Returns a repository's data, from the repo-data cache when its current version is already there.
+
+    :param datasets: Only fetch these raw datasets (see metrics.registry.required_datasets); all if None.
+    """
+    data_collector = data_collector or GitHubDataCollector()
+    repo_cache = get_repo_cache()
+    version = data_collector.get_repo_version(repo_name)
+    # A complete copy serves any subset
+    repo_data = repo_cache.get("repo_data", version)
+    partial = datasets is not None and set(datasets) != set(DATASETS)
+    if repo_data is None and partial:
+        kind = "repo_data-" + "-".join(sorted(datasets))
+        repo_data = repo_cache.get(kind, version)
+        if repo_data is None:
+            # Partial fetches skip the warehouse, which keeps complete histories only
+            repo_data = data_collector.get_repo_data(repo_name, datasets=datasets)
+            repo_cache.put(kind, repo_key(repo_data), repo_data)
+    elif repo_data is None:
+        # Only activity since the last stored sync is requested from GitHub
+        repo_data = data_collector.get_repo_data(repo_name, incremental=True)
+        # Keep the raw activity so metrics can be recomputed offline
+        ActivityWarehouse().save_repo_data(repo_data)
+        repo_cache.put("repo_data", repo_key(repo_data), repo_data)
+    return repo_data
+
+
+def calculate_repository_sketches(repo_data):
+    """Returns the RepoSketches of a repository version, building them only if they are not cached yet."""
+    repo_cache = get_repo_cache()
+    sketches = repo_cache.get("sketches", repo_key(repo_data))
+    if sketches is None:
+        sketches = MetricsCalculator(repo_data).calculate_sketches()
+        repo_cache.put("sketches", repo_key(repo_data), sketches)
+    return sketches
+
+
+def calculate_repository_metrics(repo_data, metrics=None):
+    """Returns the metrics of a repository version, calculating them only if they are not cached yet.
+
+    :param metrics: Names of the registered metrics to calculate; all if None. Only complete runs are cached.
+    """
+    if metrics is not None:
+        return MetricsCalculator(repo_data).calculate_metrics(metrics)
+    repo_cache = get_repo_cache()
+    metrics_df = repo_cache.get("metrics", repo_key(repo_data))
+    if metrics_df is None:
+        metrics_df = MetricsCalculator(repo_data).calculate_metrics(sketches=calculate_repository_sketches(repo_data))
+        repo_cache.put("metrics", repo_key(repo_data), metrics_df)
+    return metrics_df
+
+
+_worker_collector = None
+
+
+def _init_worker():
+    global _worker_collector
+    # Batch requests yield to interactive ones and leave them a share of the quota
+    _worker_collector = GitHubDataCollector(priority=BACKGROUND)
+
+
+def _repository_metrics(repo_name):
+    repo_data = fetch_repository_data(repo_name, _worker_collector)
+    return calculate_repository_metrics(repo_data), calculate_repository_sketches(repo_data)
+
+
+def calculate_metrics_batch(repo_names, max_processes=DEFAULT_BATCH_PROCESSES, on_progress=None):
+    """Collects and calculates the metrics of many repositories on a pool of worker processes.
+
+    :param repo_names: owner/repository names, e.g. from GitHubDataCollector.get_user_repositories.
+    :param max_processes: Number of worker processes.
+    :param on_progress: Optional callback receiving (done, total, repo_name, error) as each repository finishes;
+        error is None on success.
+    :return: DataFrame with one row per repository that succeeded, in the given order. Repositories that
+        failed are listed with their error in the DataFrame's attrs["failed"], and attrs["rollup"] holds
+        the percentile and distinct-contributor metrics of all of them together, merged from their sketches.
+    """
+    repo_names = list(dict.fromkeys(repo_names))
+    results, sketches, failed = {}, {}, {}
+    if repo_names:
+        # Spawned workers start clean instead of inheriting the parent's threads and open connections
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max(1, min(max_processes, len(repo_names))), mp_context=context,
+                                 initializer=_init_worker) as executor:
+            futures = {executor.submit(_repository_metrics, repo_name): repo_name for repo_name in repo_names}
+            for done, future in enumerate(as_completed(futures), start=1):
+                repo_name = futures[future]
+                try:
+                    results[repo_name], sketches[repo_name] = future.result()
+                    error = None
+                except Exception as e:
+                    failed[repo_name] = error = str(e)
+                if on_progress:
+                    on_progress(done, len(repo_names), repo_name, error)
+
+    frames = [results[repo_name] for repo_name in repo_names if repo_name in results]
+    metrics_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    metrics_df.attrs["failed"] = failed
+    metrics_df.attrs["rollup"] = RepoSketches.merge_all(sketches.values()).metrics()
+    return metrics_df
+
+
+def calculate_user_metrics(username, max_processes=DEFAULT_BATCH_PROCESSES, on_progress=None):
+    """Calculates the metrics of every repository of a user or organization; see calculate_metrics_batch."""
+    repo_names = GitHubDataCollector().get_user_repositories(username)
+    return calculate_metrics_batch(repo_names, max_processes=max_processes, on_progress=on_progress)
@@ -0,0 +1,112 @@
+"""Benchmarks MetricsEngine against the per-record MetricsDefinitions on a synthetic repository.
+
+Recomputing from the activity warehouse is timed both ways: loading records and looping over
+them, against loading NumPy columns and computing vectorized. In-memory records are timed too.
+
+Run from the repository root:
+
+    python -m metrics.benchmark --items 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from data_collection.warehouse import ActivityWarehouse
+from data_collection.records import CommitRecord, IssueRecord, PullRequestRecord, ReviewRecord
+from data_collection.review_index import build_review_index
+from metrics.definitions import MetricsDefinitions
+from metrics.vectorized import MetricsEngine
+
+
+def synthetic_repo_data(items, seed=0):
+    """Builds a get_repo_data-shaped dict with the given number of commits, PRs and issues each."""
+    rng = random.Random(seed)
+    start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+
+    def moment(after=start, max_days=3650):
+        return after + timedelta(seconds=rng.randrange(max_days * 86_400))
+
+    commits = [CommitRecord(f"{n:040x}", f"dev{rng.randrange(50)}", moment(), None) for n in range(items)]
+    pull_requests = []
+    for number in range(items):
+        created_at = moment()
+        merged_at = moment(created_at, 30) if rng.random() < 0.6 else None
+        reviews = [ReviewRecord(number, f"dev{rng.randrange(50)}", "APPROVED", moment(created_at, 10))
+                   for _ in range(rng.randrange(3))]
+        pull_requests.append(PullRequestRecord(number, "closed" if merged_at else "open", f"dev{rng.randrange(50)}",
+                                               created_at, created_at, merged_at, merged_at, merged_at is not None, reviews))
+    issues = []
+    for number in range(items):
+        created_at = moment()
+        closed_at = moment(created_at, 90) if rng.random() < 0.7 else None
+        issues.append(IssueRecord(number, "closed" if closed_at else "open", f"dev{rng.randrange(50)}",
+                                  created_at, created_at, closed_at, rng.randrange(3), False))
+    return {
+        "repo_name": "synthetic/repo", "stargazers_count": 0, "forks_count": 0, "open_issues_count": 0,
+        "watchers_count": 0, "language": None, "created_at": start, "updated_at": start, "pushed_at": start,
+        "size": 0, "contributors_count": 50, "labels": [], "topics": [],
+        "commits": commits, "pull_requests": pull_requests, "issues": issues,
+        "review_index": build_review_index(pull_requests),
+    }
+
+
+def per_record_metrics(repo_data):
+    commits, pull_requests, issues = repo_data["commits"], repo_data["pull_requests"], repo_data["issues"]
+    review_index = repo_data["review_index"]
+    return {
+        "commit_frequency": MetricsDefinitions.calculate_commit_frequency(commits),
+        "pr_merge_rate": MetricsDefinitions.calculate_pr_merge_rate(pull_requests),
+        "issue_resolution_time": MetricsDefinitions.calculate_issue_resolution_time(issues),
+        "active_days": MetricsDefinitions.calculate_active_days(commits),
+        "pr_lead_time": MetricsDefinitions.calculate_pr_lead_time(pull_requests),
+        "issue_reopen_rate": MetricsDefinitions.calculate_issue_reopen_rate(issues),
+        "pr_review_time": MetricsDefinitions.calculate_pr_review_time(review_index),
+        "time_to_first_review": MetricsDefinitions.calculate_time_to_first_review(review_index),
+        "reviewers_per_pr": MetricsDefinitions.calculate_reviewers_per_pr(review_index),
+    }
+
+
+def best_of(repeat, function, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000, help="commits, PRs and issues each")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    repo_data = synthetic_repo_data(args.items)
+    in_memory = {
+        "per-record MetricsDefinitions": lambda: per_record_metrics(repo_data),
+        "MetricsEngine.from_repo_data": lambda: MetricsEngine.from_repo_data(repo_data).metrics(),
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        warehouse = ActivityWarehouse(os.path.join(tmp_dir, "warehouse.db"))
+        warehouse.save_repo_data(repo_data)
+        from_warehouse = {
+            "load_repo_data + MetricsDefinitions": lambda: per_record_metrics(warehouse.load_repo_data("synthetic/repo")),
+            "MetricsEngine.from_warehouse": lambda: MetricsEngine.from_warehouse(warehouse, "synthetic/repo").metrics(),
+        }
+        print(f"{args.items:,} commits / PRs / issues each, best of {args.repeat}")
+        for title, runs in (("In-memory records", in_memory), ("Recompute from the warehouse", from_warehouse)):
+            print(title)
+            (baseline_name, baseline), (engine_name, engine) = runs.items()
+            baseline_seconds, expected = best_of(args.repeat, baseline)
+            engine_seconds, actual = best_of(args.repeat, engine)
+            for name, value in expected.items():
+                if abs(value - actual[name]) > 1e-9:
+                    raise SystemExit(f"{name} differs: per-record {value}, vectorized {actual[name]}")
+            print(f"  {baseline_name:<36} {baseline_seconds * 1000:9.1f} ms")
+            print(f"  {engine_name:<36} {engine_seconds * 1000:9.1f} ms  ({baseline_seconds / engine_seconds:.1f}x)")
+
+if __name__ == "__main__":
+    main()
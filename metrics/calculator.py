@@ -1,24 +1,74 @@
 from metrics.definitions import MetricsDefinitions
+from metrics.registry import MetricContext, get_metrics
+from metrics.sketches import RepoSketches
+from metrics.streaming import StreamingMetrics
+from metrics.vectorized import MetricsEngine
 import pandas as pd
 class MetricsCalculator:
     def __init__(self, repo_data):
         self.repo_data = repo_data
 
-    def calculate_metrics(self):
-        """Calculates performance metrics for the given repository data."""
-        commits = list(self.repo_data['commits'])
-        pull_requests = list(self.repo_data['pull_requests'])
-        issues = list(self.repo_data['issues'])
-
-        metrics = {
-            "repo_name": self.repo_data['repo_name'],
-            "commit_frequency": MetricsDefinitions.calculate_commit_frequency(commits),
-            "pr_merge_rate": MetricsDefinitions.calculate_pr_merge_rate(pull_requests),
-            "issue_resolution_time": MetricsDefinitions.calculate_issue_resolution_time(issues),
-            "active_days": MetricsDefinitions.calculate_active_days(commits),
-            "pr_lead_time": MetricsDefinitions.calculate_pr_lead_time(pull_requests),
-            "issue_reopen_rate": MetricsDefinitions.calculate_issue_reopen_rate(issues),
-            "pr_review_time": MetricsDefinitions.calculate_pr_review_time(pull_requests),
-            "bus_factor": MetricsDefinitions.calculate_bus_factor(self.repo_data['contributors_count']),
-        }
-        return pd.DataFrame([metrics])
+    @classmethod
+    def from_warehouse(cls, warehouse, repo_name):
+        """Creates a calculator over a repository stored in an ActivityWarehouse, with no API calls."""
+        return cls(warehouse.load_repo_data(repo_name))
+
+    @staticmethod
+    def recalculate_from_warehouse(warehouse, repo_names=None):
+        """Recomputes the metrics of every (or the given) stored repository, one row per repository.
+
+        Activity is read as NumPy columns and the metrics computed with MetricsEngine, so no records
+        are materialized.
+        """
+        repo_names = repo_names if repo_names is not None else warehouse.repo_names()
+        rows = []
+        for repo_name in repo_names:
+            engine = MetricsEngine.from_warehouse(warehouse, repo_name)
+            rows.append({
+                "repo_name": repo_name,
+                **engine.metrics(),
+                "bus_factor": MetricsDefinitions.calculate_bus_factor(warehouse.author_commit_counts(repo_name)),
+                **engine.sketches().metrics(),
+            })
+        return pd.DataFrame(rows)
+
+    def calculate_sketches(self):
+        """Builds the repository's fixed-size percentile and distinct-contributor sketches."""
+        sketches = RepoSketches()
+        sketches.add_commits(self.repo_data['commits'])
+        sketches.add_pull_requests(self.repo_data['pull_requests'])
+        sketches.add_issues(self.repo_data['issues'])
+        return sketches
+
+    def calculate_metrics(self, metrics=None, sketches=None):
+        """Calculates performance metrics for the given repository data.
+
+        :param metrics: Names of the registered metrics to calculate (see metrics/registry.py); all if None.
+            The repository data only needs the datasets those metrics declare.
+        :param sketches: The repository's RepoSketches if already built; built here otherwise.
+        """
+        context = MetricContext(self.repo_data, sketches)
+        row = {"repo_name": self.repo_data['repo_name']}
+        for metric in get_metrics(metrics):
+            row[metric.name] = metric.compute(context)
+        return pd.DataFrame([row])
+
+    @staticmethod
+    def calculate_metrics_streaming(pages, on_update=None):
+        """Calculates the same metrics from (dataset, records) pages as they are fetched, without holding them.
+
+        For scripts over repositories too large to keep in memory; the app does not use it, since its
+        dashboard and caches need the full repo_data. Only built-in metrics are computed, and the
+        percentiles come out slightly different from calculate_metrics because the sketches see the
+        values page by page.
+
+        :param pages: Iterable of pages, e.g. GitHubDataCollector.iter_repo_pages.
+        :param on_update: Optional callback receiving the partial metrics DataFrame after each page.
+        :return: DataFrame of the final metrics.
+        """
+        accumulator = StreamingMetrics()
+        for dataset, records in pages:
+            accumulator.add(dataset, records)
+            if on_update:
+                on_update(accumulator.result())
+        return accumulator.result()
@@ -1,8 +1,18 @@
+from collections import Counter
+
+# Share of all commits the bus factor's authors must account for together
+BUS_FACTOR_THRESHOLD = 0.5
+
+
 class MetricsDefinitions:
     @staticmethod
     def calculate_commit_frequency(commits):
         """Calculate the commit frequency (total number of commits per day)."""
-        total_days = (commits[-1].commit.author.date - commits[0].commit.author.date).days
+        if not commits:
+            return 0
+        # Span from the first to the last commit, whatever order the commits arrive in
+        commit_dates = [commit.date for commit in commits]
+        total_days = (max(commit_dates) - min(commit_dates)).days
         return len(commits) / total_days if total_days > 0 else 0
 
     @staticmethod
@@ -20,7 +30,7 @@ class MetricsDefinitions:
     @staticmethod
     def calculate_active_days(commits):
         """Calculate the number of active days."""
-        unique_days = set(commit.commit.author.date.date() for commit in commits)
+        unique_days = set(commit.date.date() for commit in commits)
         return len(unique_days)
 
     @staticmethod
@@ -32,16 +42,43 @@ class MetricsDefinitions:
     @staticmethod
     def calculate_issue_reopen_rate(issues):
         """Calculate the percentage of issues that were reopened."""
-        reopened_issues = [issue for issue in issues if issue.reactions['+1'] > 0]  # Simulating reopened as having reactions
+        reopened_issues = [issue for issue in issues if issue.thumbs_up > 0]  # Simulating reopened as having reactions
         return len(reopened_issues) / len(issues) if issues else 0
 
     @staticmethod
-    def calculate_pr_review_time(pull_requests):
-        """Calculate the average PR review time in days."""
-        review_times = [(review.submitted_at - pr.created_at).days for pr in pull_requests for review in pr.get_reviews()]
-        return sum(review_times) / len(review_times) if review_times else 0
+    def calculate_pr_review_time(review_index):
+        """Calculate the average PR review time in days, from the review index."""
+        review_count = sum(summary.review_count for summary in review_index.values())
+        return sum(summary.review_days for summary in review_index.values()) / review_count if review_count else 0
+
+    @staticmethod
+    def calculate_time_to_first_review(review_index):
+        """Calculate the average time in days from a PR being opened to its first review."""
+        waits = [(summary.first_review_at - summary.created_at).days
+                 for summary in review_index.values() if summary.first_review_at is not None]
+        return sum(waits) / len(waits) if waits else 0
 
     @staticmethod
-    def calculate_bus_factor(contributors_count):
-        """Estimate the bus factor, assuming it's the number of contributors divided by a factor."""
-        return max(1, contributors_count // 100)  # Example logic
+    def calculate_reviewers_per_pr(review_index):
+        """Calculate the average number of distinct reviewers per PR."""
+        return sum(len(summary.reviewers) for summary in review_index.values()) / len(review_index) if review_index else 0
+
+    @staticmethod
+    def count_commits_by_author(commits):
+        """Count the commits of each author in one pass."""
+        return Counter(commit.author for commit in commits if commit.author)
+
+    @staticmethod
+    def calculate_bus_factor(author_commit_counts, threshold=BUS_FACTOR_THRESHOLD):
+        """Calculate the bus (truck) factor: the fewest authors who together made over half of the commits.
+
+        Losing those authors would take most of the repository's authorship with them.
+        """
+        total = sum(author_commit_counts.values())
+        if not total:
+            return 0
+        covered = 0
+        for bus_factor, count in enumerate(sorted(author_commit_counts.values(), reverse=True), start=1):
+            covered += count
+            if covered > total * threshold:
+                return bus_factor
@@ -0,0 +1,132 @@
+import importlib
+import os
+
+from data_collection.records import DATASETS
+from data_collection.review_index import build_review_index
+from metrics.definitions import MetricsDefinitions
+from metrics.sketches import PERCENTILES, RepoSketches
+
+# Comma-separated modules imported at startup; they add metrics with register_metric
+METRIC_PLUGINS = [name.strip() for name in os.getenv("GITPULSE_METRIC_PLUGINS", "").split(",") if name.strip()]
+
+
+class Metric:
+    """A registered metric: its column name, the raw datasets it reads and how to compute it."""
+    __slots__ = ("name", "datasets", "compute")
+
+    def __init__(self, name, datasets, compute):
+        self.name = name
+        self.datasets = frozenset(datasets)
+        self.compute = compute
+
+
+class MetricContext:
+    """What a metric's compute function receives: the repository data plus shared derived values.
+
+    Values several metrics use (the review index, per-author commit counts, the sketches) are
+    built on first use and then reused for the rest of the run.
+    """
+
+    def __init__(self, repo_data, sketches=None):
+        self.repo_data = repo_data
+        self.commits = list(repo_data.get('commits', ()))
+        self.pull_requests = list(repo_data.get('pull_requests', ()))
+        self.issues = list(repo_data.get('issues', ()))
+        self._review_index = repo_data.get('review_index')
+        self._author_commit_counts = None
+        self._sketch_metrics = sketches.metrics() if sketches is not None else None
+
+    @property
+    def review_index(self):
+        # Data collected before the index existed (e.g. older caches) gets it built here
+        if self._review_index is None:
+            self._review_index = build_review_index(self.pull_requests)
+        return self._review_index
+
+    @property
+    def author_commit_counts(self):
+        if self._author_commit_counts is None:
+            self._author_commit_counts = MetricsDefinitions.count_commits_by_author(self.commits)
+        return self._author_commit_counts
+
+    @property
+    def sketch_metrics(self):
+        if self._sketch_metrics is None:
+            sketches = RepoSketches()
+            sketches.add_commits(self.commits)
+            sketches.add_pull_requests(self.pull_requests)
+            sketches.add_issues(self.issues)
+            self._sketch_metrics = sketches.metrics()
+        return self._sketch_metrics
+
+
+_metrics = {}
+
+
+def register_metric(name, datasets, compute=None):
+    """Registers a metric column, computed by compute(context) from the given datasets.
+
+    Usable as a decorator:
+
+        @register_metric("open_pr_count", datasets=["pull_requests"])
+        def open_pr_count(context):
+            return sum(pr.state == "open" for pr in context.pull_requests)
+    """
+    unknown = set(datasets) - set(DATASETS)
+    if unknown:
+        raise ValueError(f"Unknown datasets for metric {name}: {', '.join(sorted(unknown))}")
+
+    def register(compute):
+        _metrics[name] = Metric(name, datasets, compute)
+        return compute
+
+    return register(compute) if compute is not None else register
+
+
+def metric_names():
+    """Returns the names of every registered metric, in registration order."""
+    return list(_metrics)
+
+
+def get_metrics(names=None):
+    """Returns the registered metrics with the given names (all of them if None)."""
+    if names is None:
+        return list(_metrics.values())
+    unknown = [name for name in names if name not in _metrics]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+    return [_metrics[name] for name in names]
+
+
+def required_datasets(names=None):
+    """Returns the raw datasets the given metrics need, e.g. {"commits"} for commit_frequency alone."""
+    datasets = set()
+    for metric in get_metrics(names):
+        datasets |= metric.datasets
+    # Reviews are fetched per pull request
+    if "reviews" in datasets:
+        datasets.add("pull_requests")
+    return datasets
+
+
+# Built-in metrics, in the column order calculate_metrics has always used
+
+register_metric("commit_frequency", ["commits"], lambda c: MetricsDefinitions.calculate_commit_frequency(c.commits))
+register_metric("pr_merge_rate", ["pull_requests"], lambda c: MetricsDefinitions.calculate_pr_merge_rate(c.pull_requests))
+register_metric("issue_resolution_time", ["issues"], lambda c: MetricsDefinitions.calculate_issue_resolution_time(c.issues))
+register_metric("active_days", ["commits"], lambda c: MetricsDefinitions.calculate_active_days(c.commits))
+register_metric("pr_lead_time", ["pull_requests"], lambda c: MetricsDefinitions.calculate_pr_lead_time(c.pull_requests))
+register_metric("issue_reopen_rate", ["issues"], lambda c: MetricsDefinitions.calculate_issue_reopen_rate(c.issues))
+register_metric("pr_review_time", ["reviews"], lambda c: MetricsDefinitions.calculate_pr_review_time(c.review_index))
+register_metric("time_to_first_review", ["reviews"], lambda c: MetricsDefinitions.calculate_time_to_first_review(c.review_index))
+register_metric("reviewers_per_pr", ["reviews"], lambda c: MetricsDefinitions.calculate_reviewers_per_pr(c.review_index))
+register_metric("bus_factor", ["commits"], lambda c: MetricsDefinitions.calculate_bus_factor(c.author_commit_counts))
+
+for _sketched, _datasets in (("issue_resolution_time", ["issues"]), ("pr_lead_time", ["pull_requests"]), ("pr_review_time", ["reviews"])):
+    for _percentile in PERCENTILES:
+        _column = f"{_sketched}_p{_percentile}"
+        register_metric(_column, _datasets, lambda c, column=_column: c.sketch_metrics[column])
+register_metric("distinct_contributors", ["commits", "pull_requests", "reviews"], lambda c: c.sketch_metrics["distinct_contributors"])
+
+for _plugin in METRIC_PLUGINS:
+    importlib.import_module(_plugin)
@@ -0,0 +1,187 @@
+import hashlib
+import math
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+# Sketch sizes; both bound memory per repository regardless of how much history is fed in
+DIGEST_COMPRESSION = 100
+HLL_PRECISION = 12
+
+
+class QuantileSketch:
+    """Mergeable t-digest-style sketch of a distribution, for approximate percentiles.
+
+    Values are buffered and periodically folded into weighted centroids. Centroids stay small near
+    the tails (where p90/p99 live) and grow towards the median, so roughly `compression` centroids
+    are kept however many values are added.
+    """
+
+    def __init__(self, compression=DIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.buffer = []
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum()) + sum(len(values) for values in self.buffer)
+
+    def add(self, values):
+        """Adds an array (or iterable) of values; NaNs are ignored."""
+        values = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.buffer.append(values)
+        if sum(len(buffered) for buffered in self.buffer) >= self.compression * 10:
+            self._compress()
+
+    def merge(self, other):
+        """Folds another sketch into this one, as if its values had been added here."""
+        other._compress()
+        if not len(other.weights):
+            return
+        self._compress(other.means, other.weights)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _k(self, q):
+        # Scale function: centroid k-spans of 1 are narrow at q≈0 and q≈1, wide around the median
+        return self.compression / (2 * math.pi) * np.arcsin(2 * np.clip(q, 0, 1) - 1)
+
+    def _compress(self, extra_means=None, extra_weights=None):
+        means = [self.means] + self.buffer
+        weights = [self.weights] + [np.ones(len(values)) for values in self.buffer]
+        if extra_means is not None:
+            means.append(extra_means)
+            weights.append(extra_weights)
+        self.buffer = []
+        means, weights = np.concatenate(means), np.concatenate(weights)
+        if not len(means):
+            return
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Each point joins the centroid of the unit k-interval its weight's midpoint falls into
+        midpoints = (np.cumsum(weights) - weights / 2) / total
+        cluster = np.floor(self._k(midpoints) - self._k(0)).astype(np.int64)
+        cluster = np.unique(cluster, return_inverse=True)[1]
+        self.weights = np.bincount(cluster, weights=weights)
+        self.means = np.bincount(cluster, weights=means * weights) / self.weights
+
+    def quantile(self, q):
+        """Returns the approximate q-quantile (0 <= q <= 1), or NaN if the sketch is empty."""
+        self._compress()
+        if not len(self.weights):
+            return math.nan
+        if len(self.weights) == 1:
+            return float(self.means[0])
+        centers = np.cumsum(self.weights) - self.weights / 2
+        # Interpolates between centroid centers, with the exact min and max at the ends
+        positions = np.concatenate(([0.0], centers, [self.weights.sum()]))
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        return float(np.interp(q * self.weights.sum(), positions, values))
+
+    def percentiles(self, percentiles=PERCENTILES):
+        return {p: self.quantile(p / 100) for p in percentiles}
+
+
+class HyperLogLog:
+    """Mergeable HyperLogLog counter of distinct values, in 2**precision one-byte registers."""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values):
+        """Adds an iterable of hashable-as-string values; None is ignored."""
+        for value in values:
+            if value is None:
+                continue
+            hashed = int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+            index = hashed >> (64 - self.precision)
+            rest = hashed & ((1 << (64 - self.precision)) - 1)
+            # Position of the first 1-bit in the remaining bits
+            rank = (64 - self.precision) - rest.bit_length() + 1
+            if rank > self.registers[index]:
+                self.registers[index] = rank
+
+    def merge(self, other):
+        """Folds another counter with the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog counters of different precision.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self):
+        """Returns the estimated number of distinct values added."""
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class RepoSketches:
+    """Fixed-size sketches of one repository (or a merged rollup of several).
+
+    Holds quantile sketches of issue resolution, PR lead and PR review times in fractional days,
+    and a HyperLogLog of the authors of commits, pull requests and reviews. Sketches from separate
+    repositories merge into an organization-level rollup without touching the raw activity again.
+    """
+
+    def __init__(self):
+        self.issue_resolution_time = QuantileSketch()
+        self.pr_lead_time = QuantileSketch()
+        self.pr_review_time = QuantileSketch()
+        self.contributors = HyperLogLog()
+
+    def add_commits(self, commits):
+        self.contributors.add({commit.author for commit in commits})
+
+    def add_pull_requests(self, pull_requests):
+        self.pr_lead_time.add(
+            (pr.merged_at - pr.created_at).total_seconds() / 86_400 for pr in pull_requests if pr.merged
+        )
+        self.pr_review_time.add(
+            (review.submitted_at - pr.created_at).total_seconds() / 86_400
+            for pr in pull_requests for review in pr.get_reviews() if review.submitted_at is not None
+        )
+        self.contributors.add({pr.author for pr in pull_requests})
+        self.contributors.add({review.author for pr in pull_requests for review in pr.get_reviews()})
+
+    def add_issues(self, issues):
+        self.issue_resolution_time.add(
+            (issue.closed_at - issue.created_at).total_seconds() / 86_400
+            for issue in issues if issue.state == 'closed' and issue.closed_at is not None
+        )
+
+    def merge(self, other):
+        """Folds another repository's sketches into these."""
+        for name in ("issue_resolution_time", "pr_lead_time", "pr_review_time", "contributors"):
+            getattr(self, name).merge(getattr(other, name))
+        return self
+
+    @classmethod
+    def merge_all(cls, sketches):
+        """Returns a new rollup of several repositories' sketches."""
+        rollup = cls()
+        for repo_sketches in sketches:
+            rollup.merge(repo_sketches)
+        return rollup
+
+    def metrics(self):
+        """Returns the percentile columns (e.g. pr_lead_time_p90, in days) and distinct_contributors."""
+        metrics = {}
+        for name in ("issue_resolution_time", "pr_lead_time", "pr_review_time"):
+            for percentile, value in getattr(self, name).percentiles().items():
+                metrics[f"{name}_p{percentile}"] = value
+        metrics["distinct_contributors"] = self.contributors.count()
+        return metrics
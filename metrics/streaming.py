@@ -0,0 +1,115 @@
+from collections import Counter
+
+import pandas as pd
+from data_collection.review_index import ReviewSummary
+from metrics.definitions import MetricsDefinitions
+from metrics.sketches import RepoSketches
+
+
+class StreamingMetrics:
+    """Incremental accumulators for the repository metrics, fed one page of records at a time.
+
+    Only counts, running sums, the first/last commit date, the set of active days and a commit
+    counter per author are kept, so memory stays flat however many commits, PRs and issues flow
+    through. result() can be called
+    at any point to get the metrics for everything seen so far, in the same shape as
+    MetricsCalculator.calculate_metrics. Only the built-in metrics are computed: metrics added through
+    metrics.registry plugins need the full records and are left out.
+    """
+
+    def __init__(self, repo_name=None):
+        self.repo_name = repo_name
+        # Commits
+        self.commit_count = 0
+        self.author_commit_counts = Counter()
+        # Percentiles and distinct contributors, in fixed-size sketches
+        self.sketches = RepoSketches()
+        self.first_commit_date = None
+        self.last_commit_date = None
+        self.active_days = set()
+        # Pull requests
+        self.pr_count = 0
+        self.merged_pr_count = 0
+        self.lead_time_days = 0
+        self.review_count = 0
+        self.review_time_days = 0
+        self.first_reviewed_pr_count = 0
+        self.first_review_wait_days = 0
+        self.reviewer_count = 0
+        # Issues
+        self.issue_count = 0
+        self.closed_issue_count = 0
+        self.resolution_time_days = 0
+        self.reopened_issue_count = 0
+
+    def add(self, dataset, records):
+        """Feeds one page of records; dataset is "commits", "pull_requests", "issues" or "repository"."""
+        if dataset == "repository":
+            self.repo_name = records["repo_name"]
+        elif dataset == "commits":
+            self.add_commits(records)
+        elif dataset == "pull_requests":
+            self.add_pull_requests(records)
+        elif dataset == "issues":
+            self.add_issues(records)
+
+    def add_commits(self, commits):
+        commits = list(commits)
+        self.sketches.add_commits(commits)
+        for commit in commits:
+            self.commit_count += 1
+            if self.first_commit_date is None or commit.date < self.first_commit_date:
+                self.first_commit_date = commit.date
+            if self.last_commit_date is None or commit.date > self.last_commit_date:
+                self.last_commit_date = commit.date
+            self.active_days.add(commit.date.date())
+            if commit.author:
+                self.author_commit_counts[commit.author] += 1
+
+    def add_pull_requests(self, pull_requests):
+        pull_requests = list(pull_requests)
+        self.sketches.add_pull_requests(pull_requests)
+        for pr in pull_requests:
+            self.pr_count += 1
+            if pr.merged:
+                self.merged_pr_count += 1
+                self.lead_time_days += (pr.merged_at - pr.created_at).days
+            summary = ReviewSummary.from_pull_request(pr)
+            self.review_count += summary.review_count
+            self.review_time_days += summary.review_days
+            self.reviewer_count += len(summary.reviewers)
+            if summary.first_review_at is not None:
+                self.first_reviewed_pr_count += 1
+                self.first_review_wait_days += (summary.first_review_at - pr.created_at).days
+
+    def add_issues(self, issues):
+        issues = list(issues)
+        self.sketches.add_issues(issues)
+        for issue in issues:
+            self.issue_count += 1
+            if issue.state == 'closed':
+                self.closed_issue_count += 1
+                self.resolution_time_days += (issue.closed_at - issue.created_at).days
+            if issue.thumbs_up > 0:  # Simulating reopened as having reactions
+                self.reopened_issue_count += 1
+
+    def result(self):
+        """Returns the metrics for the records seen so far as a one-row DataFrame."""
+        commit_span = (self.last_commit_date - self.first_commit_date).days if self.commit_count else 0
+        metrics = {
+            "repo_name": self.repo_name,
+            "commit_frequency": self.commit_count / commit_span if commit_span > 0 else 0,
+            "pr_merge_rate": self.merged_pr_count / self.pr_count if self.pr_count else 0,
+            "issue_resolution_time": self.resolution_time_days / self.closed_issue_count if self.closed_issue_count else 0,
+            "active_days": len(self.active_days),
+            "pr_lead_time": self.lead_time_days / self.merged_pr_count if self.merged_pr_count else 0,
+            "issue_reopen_rate": self.reopened_issue_count / self.issue_count if self.issue_count else 0,
+            "pr_review_time": self.review_time_days / self.review_count if self.review_count else 0,
+            "time_to_first_review": (
+                self.first_review_wait_days / self.first_reviewed_pr_count if self.first_reviewed_pr_count else 0
+            ),
+            "reviewers_per_pr": self.reviewer_count / self.pr_count if self.pr_count else 0,
+            "bus_factor": MetricsDefinitions.calculate_bus_factor(self.author_commit_counts),
+            **self.sketches.metrics(),
+        }
+        return pd.DataFrame([metrics])
@@ -0,0 +1,145 @@
+import numpy as np
+
+from data_collection.review_index import build_review_index
+from metrics.sketches import RepoSketches
+
+SECONDS_PER_DAY = 86_400
+
+
+def _timestamps(values, count):
+    """Reads datetimes (None allowed) into an array of epoch seconds, NaN where missing."""
+    return np.fromiter((np.nan if value is None else value.timestamp() for value in values), dtype=float, count=count)
+
+
+def _whole_days(seconds):
+    # Floored like timedelta.days; rounding to the microsecond first absorbs float error at day boundaries
+    return np.floor(np.round(seconds, 6) / SECONDS_PER_DAY)
+
+
+def _mean_days(end, start, mask):
+    if not mask.any():
+        return 0
+    return float(np.mean(_whole_days(end[mask] - start[mask])))
+
+
+class MetricsEngine:
+    """Column-oriented view of a repository's activity for computing every metric in vectorized form.
+
+    Timestamps are held as epoch seconds (NaN where missing) alongside state and count arrays, and
+    each metric is an array operation over those columns. Results match MetricsDefinitions.
+    from_warehouse reads the columns straight out of SQLite, so no per-item Python objects are built
+    at all; from_records reads each attribute of in-memory records once, which costs more than the
+    per-record loops save, so in-memory results keep going through MetricsDefinitions.
+    """
+
+    def __init__(self, commit_dates, pr_created, pr_merged_at, pr_merged, pr_first_review, pr_reviewer_count,
+                 review_submitted, review_pr_created, issue_created, issue_closed_at, issue_closed, issue_thumbs_up,
+                 contributors=()):
+        self.commit_dates = commit_dates
+        self.pr_created = pr_created
+        self.pr_merged_at = pr_merged_at
+        self.pr_merged = pr_merged
+        self.pr_first_review = pr_first_review
+        self.pr_reviewer_count = pr_reviewer_count
+        self.review_submitted = review_submitted
+        # Each review lines up with the creation time of its pull request
+        self.review_pr_created = review_pr_created
+        self.issue_created = issue_created
+        self.issue_closed_at = issue_closed_at
+        self.issue_closed = issue_closed
+        self.issue_thumbs_up = issue_thumbs_up
+        # Distinct authors of commits, pull requests and reviews
+        self.contributors = contributors
+
+    @classmethod
+    def from_records(cls, commits, pull_requests, issues):
+        """Builds the columns from commit, pull request and issue records."""
+        pr_created = _timestamps((pr.created_at for pr in pull_requests), len(pull_requests))
+        review_index = build_review_index(pull_requests)
+        summaries = [review_index[pr.number] for pr in pull_requests]
+        reviews = [pr.get_reviews() for pr in pull_requests]
+        review_counts = np.fromiter((len(pr_reviews) for pr_reviews in reviews), dtype=np.int64, count=len(reviews))
+        return cls(
+            commit_dates=_timestamps((commit.date for commit in commits), len(commits)),
+            pr_created=pr_created,
+            pr_merged_at=_timestamps((pr.merged_at for pr in pull_requests), len(pull_requests)),
+            pr_merged=np.fromiter((pr.merged for pr in pull_requests), dtype=bool, count=len(pull_requests)),
+            pr_first_review=_timestamps((summary.first_review_at for summary in summaries), len(summaries)),
+            pr_reviewer_count=np.fromiter((len(summary.reviewers) for summary in summaries), dtype=np.int64, count=len(summaries)),
+            review_submitted=_timestamps(
+                (review.submitted_at for pr_reviews in reviews for review in pr_reviews), int(review_counts.sum())
+            ),
+            review_pr_created=np.repeat(pr_created, review_counts),
+            issue_created=_timestamps((issue.created_at for issue in issues), len(issues)),
+            issue_closed_at=_timestamps((issue.closed_at for issue in issues), len(issues)),
+            issue_closed=np.fromiter((issue.state == 'closed' for issue in issues), dtype=bool, count=len(issues)),
+            issue_thumbs_up=np.fromiter((issue.thumbs_up for issue in issues), dtype=np.int64, count=len(issues)),
+            contributors={commit.author for commit in commits} | {pr.author for pr in pull_requests}
+                         | {review.author for pr_reviews in reviews for review in pr_reviews},
+        )
+
+    @classmethod
+    def from_repo_data(cls, repo_data):
+        """Builds the columns from a get_repo_data result."""
+        return cls.from_records(repo_data['commits'], repo_data['pull_requests'], repo_data['issues'])
+
+    @classmethod
+    def from_warehouse(cls, warehouse, repo_name):
+        """Builds the columns of a repository stored in an ActivityWarehouse."""
+        return cls(**warehouse.load_activity_columns(repo_name))
+
+    def commit_frequency(self):
+        if not len(self.commit_dates):
+            return 0
+        total_days = _whole_days(self.commit_dates.max() - self.commit_dates.min())
+        return len(self.commit_dates) / total_days if total_days > 0 else 0
+
+    def pr_merge_rate(self):
+        return self.pr_merged.sum() / len(self.pr_merged) if len(self.pr_merged) else 0
+
+    def issue_resolution_time(self):
+        return _mean_days(self.issue_closed_at, self.issue_created, self.issue_closed)
+
+    def active_days(self):
+        # Calendar days in UTC
+        return len(np.unique(np.floor(self.commit_dates / SECONDS_PER_DAY)))
+
+    def pr_lead_time(self):
+        return _mean_days(self.pr_merged_at, self.pr_created, self.pr_merged)
+
+    def issue_reopen_rate(self):
+        # Simulating reopened as having reactions
+        return np.count_nonzero(self.issue_thumbs_up > 0) / len(self.issue_thumbs_up) if len(self.issue_thumbs_up) else 0
+
+    def pr_review_time(self):
+        # Pending reviews have no submission time yet
+        return _mean_days(self.review_submitted, self.review_pr_created, ~np.isnan(self.review_submitted))
+
+    def time_to_first_review(self):
+        return _mean_days(self.pr_first_review, self.pr_created, ~np.isnan(self.pr_first_review))
+
+    def reviewers_per_pr(self):
+        return float(self.pr_reviewer_count.mean()) if len(self.pr_reviewer_count) else 0
+
+    def sketches(self):
+        """Returns the repository's RepoSketches, fed from the columns in fractional days."""
+        sketches = RepoSketches()
+        sketches.issue_resolution_time.add((self.issue_closed_at - self.issue_created)[self.issue_closed] / SECONDS_PER_DAY)
+        sketches.pr_lead_time.add((self.pr_merged_at - self.pr_created)[self.pr_merged] / SECONDS_PER_DAY)
+        sketches.pr_review_time.add((self.review_submitted - self.review_pr_created) / SECONDS_PER_DAY)
+        sketches.contributors.add(self.contributors)
+        return sketches
+
+    def metrics(self):
+        """Returns every activity metric as a dict keyed by the calculate_metrics column names."""
+        return {
+            "commit_frequency": self.commit_frequency(),
+            "pr_merge_rate": float(self.pr_merge_rate()),
+            "issue_resolution_time": self.issue_resolution_time(),
+            "active_days": self.active_days(),
+            "pr_lead_time": self.pr_lead_time(),
+            "issue_reopen_rate": self.issue_reopen_rate(),
+            "pr_review_time": self.pr_review_time(),
+            "time_to_first_review": self.time_to_first_review(),
+            "reviewers_per_pr": self.reviewers_per_pr(),
+        }
@@ -0,0 +1,120 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Per-day sums every windowed metric is derived from
+COUNTERS = ("commits", "prs_closed", "prs_merged", "lead_time_days", "issues_closed", "resolution_days")
+
+PERIODS = {"week": "W-MON", "month": "MS"}
+
+
+def _utc_day(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _commit_contribution(commit):
+    return _utc_day(commit.date), {"commits": 1}
+
+
+def _pull_request_contribution(pr):
+    # A pull request counts towards the day it was closed; open ones count nowhere yet
+    closed_at = pr.merged_at or pr.closed_at
+    if closed_at is None:
+        return None
+    if pr.merged:
+        return _utc_day(closed_at), {"prs_closed": 1, "prs_merged": 1, "lead_time_days": (pr.merged_at - pr.created_at).days}
+    return _utc_day(closed_at), {"prs_closed": 1}
+
+
+def _issue_contribution(issue):
+    if issue.state != 'closed' or issue.closed_at is None:
+        return None
+    return _utc_day(issue.closed_at), {"issues_closed": 1, "resolution_days": (issue.closed_at - issue.created_at).days}
+
+
+def _rates(sums):
+    """Turns counter sums (a DataFrame with COUNTERS columns) into metric columns."""
+    frame = pd.DataFrame(index=sums.index)
+    frame["commits"] = sums["commits"]
+    frame["pr_merge_rate"] = (sums["prs_merged"] / sums["prs_closed"]).where(sums["prs_closed"] > 0)
+    frame["pr_lead_time"] = (sums["lead_time_days"] / sums["prs_merged"]).where(sums["prs_merged"] > 0)
+    frame["issue_resolution_time"] = (sums["resolution_days"] / sums["issues_closed"]).where(sums["issues_closed"] > 0)
+    return frame
+
+
+class PeriodMetrics:
+    """Day buckets of commit, pull request and issue activity, from which windowed metrics are derived.
+
+    Each item is counted once towards the UTC day it happened on (committed, closed or merged), and
+    the contribution is remembered by id. When an incremental sync delivers new or changed items,
+    update() moves only those items between buckets, so the history is never rescanned; weekly,
+    monthly and rolling series are then sums over the day buckets.
+    """
+
+    def __init__(self):
+        self.buckets = {}  # day -> {counter: sum}
+        self.contributions = {}  # (dataset, id) -> (day, {counter: value})
+
+    def update(self, commits=(), pull_requests=(), issues=()):
+        """Adds new items and re-buckets changed ones (matched by sha or number)."""
+        for dataset, items, key, contribution in (
+            ("commits", commits, lambda commit: commit.sha, _commit_contribution),
+            ("pull_requests", pull_requests, lambda pr: pr.number, _pull_request_contribution),
+            ("issues", issues, lambda issue: issue.number, _issue_contribution),
+        ):
+            for item in items:
+                self._apply((dataset, key(item)), contribution(item))
+
+    def _apply(self, item_key, contribution):
+        previous = self.contributions.pop(item_key, None)
+        if previous is not None:
+            day, values = previous
+            bucket = self.buckets[day]
+            for counter, value in values.items():
+                bucket[counter] -= value
+            if not any(bucket.values()):
+                del self.buckets[day]
+        if contribution is not None:
+            day, values = contribution
+            bucket = self.buckets.setdefault(day, dict.fromkeys(COUNTERS, 0))
+            for counter, value in values.items():
+                bucket[counter] += value
+            self.contributions[item_key] = contribution
+
+    def daily(self, end=None):
+        """Returns the day buckets as a DataFrame of COUNTERS, one row per day up to end (default today)."""
+        if not self.buckets:
+            return pd.DataFrame(columns=list(COUNTERS), index=pd.DatetimeIndex([], name="date"), dtype=float)
+        frame = pd.DataFrame.from_dict(self.buckets, orient="index", columns=list(COUNTERS))
+        frame.index = pd.DatetimeIndex(frame.index, name="date")
+        end = pd.Timestamp(end or datetime.now(timezone.utc).date())
+        days = pd.date_range(frame.index.min(), max(frame.index.max(), end), freq="D", name="date")
+        return frame.reindex(days, fill_value=0)
+
+    def periods(self, period="week", end=None):
+        """Returns commits, merge rate, lead time and resolution time per calendar week or month.
+
+        Rates are NaN for periods in which nothing they measure happened.
+        """
+        sums = self.daily(end).resample(PERIODS[period], label="left", closed="left").sum()
+        return _rates(sums)
+
+    def rolling(self, days=30, end=None):
+        """Returns the same metrics over a trailing window of the given number of days, one row per day."""
+        return _rates(self.daily(end).rolling(days, min_periods=1).sum())
+
+    def time_series(self, end=None):
+        """Returns every windowed series as a long DataFrame (date, window, metric, value) for charting."""
+        frames = []
+        for window, frame in (
+            ("weekly", self.periods("week", end)),
+            ("monthly", self.periods("month", end)),
+            ("rolling 30 days", self.rolling(30, end)),
+            ("rolling 90 days", self.rolling(90, end)),
+        ):
+            long = frame.rename_axis("date").reset_index().melt(id_vars="date", var_name="metric", value_name="value")
+            long.insert(1, "window", window)
+            frames.append(long)
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,226 @@
+import math
+import numbers
+import re
+import threading
+from functools import lru_cache
+
+import pandas as pd
+
+# Phrases users ask for each metric column, besides the column name itself ("pr_lead_time" -> "pr lead time").
+# Bare nouns such as "commits" or "contributors" are left out: questions using them usually ask for a
+# count or a list of people, which no metric column answers
+METRIC_ALIASES = {
+    "commit_frequency": ["commit frequency", "commits per day", "commit rate"],
+    "pr_merge_rate": ["merge rate", "pr merge rate", "pull request merge rate"],
+    "issue_resolution_time": ["issue resolution time", "resolution time", "time to resolve issues", "time to close issues"],
+    "active_days": ["active days", "days active"],
+    "pr_lead_time": ["lead time", "pr lead time", "time to merge", "merge time"],
+    "issue_reopen_rate": ["reopen rate", "issue reopen rate"],
+    "pr_review_time": ["review time", "pr review time"],
+    "time_to_first_review": ["time to first review", "first review"],
+    "reviewers_per_pr": ["reviewers per pr", "reviewers per pull request"],
+    "bus_factor": ["bus factor", "truck factor"],
+    "distinct_contributors": ["distinct contributors", "number of contributors", "how many contributors"],
+}
+
+# Metrics that are counts, so "how many"/"total" questions about them can be answered with their value
+COUNT_METRICS = {"active_days", "distinct_contributors"}
+
+# How values are phrased in answers; columns not listed are shown as plain numbers
+RATE_METRICS = {"pr_merge_rate", "issue_reopen_rate"}
+DAY_METRICS = {"issue_resolution_time", "pr_lead_time", "pr_review_time", "time_to_first_review"}
+PERCENTILE_WORDS = {"median": 50, "p50": 50, "50th percentile": 50, "p90": 90, "90th percentile": 90,
+                    "p99": 99, "99th percentile": 99}
+
+# Questions asking for explanation or advice need the LLM even when they name a metric
+OPEN_ENDED = re.compile(
+    r"\b(why|how (?:can|do|could|should|to)|improve|suggest|recommend|advice|advise|explain|"
+    r"interpret|meaning|what does|summari[sz]e|summary|insights?|trend|good|bad|healthy|should)\b"
+)
+# Asking for a count or a list of people or items: answered locally only when the metric is itself a count
+COUNT_QUESTION = re.compile(r"\b(how many|total|number of|count)\b")
+LIST_QUESTION = re.compile(r"\b(who|whom|whose|list|name the)\b")
+COMPARISON = re.compile(r"\b(compare|comparison|vs|versus|or|than|between)\b")
+HIGHEST = re.compile(r"\b(highest|most|max(?:imum)?|largest|longest|best|top)\b")
+LOWEST = re.compile(r"\b(lowest|least|min(?:imum)?|smallest|shortest|fewest|worst)\b")
+THRESHOLD = re.compile(
+    r"(>=|<=|>|<|at least|at most|no more than|no less than|more than|greater than|higher than|larger than|above|over|"
+    r"exceeds?|less than|fewer than|lower than|smaller than|below|under)\s*(-?\d+(?:\.\d+)?)\s*(%|percent)?"
+)
+THRESHOLD_OPERATORS = {
+    ">=": ">=", "at least": ">=", "no less than": ">=",
+    "<=": "<=", "at most": "<=", "no more than": "<=",
+    "<": "<", "less than": "<", "fewer than": "<", "lower than": "<", "smaller than": "<", "below": "<", "under": "<",
+}
+
+
+def format_value(column, value):
+    """Formats a metric value with its unit, e.g. 0.42 merge rate as "42.0%"."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "not available"
+    unit = _unit(column)
+    if unit == "rate":
+        return f"{value:.1%}"
+    if unit == "days":
+        return f"{value:.2f} days"
+    if not isinstance(value, numbers.Real):
+        return str(value)
+    return f"{int(value)}" if float(value).is_integer() else f"{value:.2f}"
+
+
+def _unit(column):
+    base = re.sub(r"_p\d+$", "", column)
+    return "rate" if base in RATE_METRICS else "days" if base in DAY_METRICS else None
+
+
+def _label(column):
+    match = re.fullmatch(r"(.+)_p(\d+)", column)
+    if match:
+        return f"p{match.group(2)} {match.group(1).replace('_', ' ')}"
+    return column.replace("_", " ")
+
+
+@lru_cache(maxsize=32)
+def _alias_pattern(columns):
+    """Returns a regex matching any alias of the given columns (longest first) and the alias -> column map."""
+    aliases = {}
+    for column in columns:
+        if column == "repo_name" or re.search(r"_p\d+$", column):
+            continue
+        for alias in [column.replace("_", " ")] + METRIC_ALIASES.get(column, []):
+            aliases.setdefault(alias, column)
+    pattern = "|".join(re.escape(alias) for alias in sorted(aliases, key=len, reverse=True))
+    return re.compile(rf"\b(?:{pattern})\b"), aliases
+
+
+class IntentRouter:
+    """Answers direct metric questions from the metrics DataFrame, without asking the LLM.
+
+    Lookups ("what's the merge rate?"), comparisons ("lead time vs review time", "which repo has the
+    most active days") and thresholds ("is the bus factor above 2?") are matched against the known
+    metric columns and answered from the DataFrame. Anything else, including questions asking why or
+    for advice, is left to the LLM. hits and misses count how often each happened.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def route(self, query: str, metrics_df: pd.DataFrame):
+        """Returns the answer to a direct metric question, or None if the LLM should handle it."""
+        answer = self._answer(query.lower(), metrics_df) if not metrics_df.empty else None
+        with self.lock:
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return answer
+
+    def _answer(self, query, metrics_df):
+        if OPEN_ENDED.search(query):
+            return None
+        columns = self._metrics(query, metrics_df)
+        if not columns or LIST_QUESTION.search(query):
+            return None
+        if COUNT_QUESTION.search(query) and not all(re.sub(r"_p\d+$", "", column) in COUNT_METRICS for column in columns):
+            return None
+        rows = self._repositories(query, metrics_df)
+
+        threshold = THRESHOLD.search(query)
+        if threshold and len(columns) == 1:
+            return self._threshold(columns[0], rows, threshold)
+        if len(columns) == 1 and len(rows) > 1 and "repo_name" in rows.columns and (HIGHEST.search(query) or LOWEST.search(query)):
+            return self._extreme(columns[0], rows, highest=bool(HIGHEST.search(query)))
+        if len(columns) == 2 and len(rows) == 1 and COMPARISON.search(query):
+            return self._compare_metrics(columns, rows.iloc[0])
+        if len(columns) > 2 and COMPARISON.search(query):
+            return None
+        return self._lookup(columns, rows)
+
+    def _metrics(self, query, metrics_df):
+        pattern, aliases = _alias_pattern(tuple(metrics_df.columns))
+        percentiles = [percentile for word, percentile in PERCENTILE_WORDS.items() if re.search(rf"\b{word}\b", query)]
+        columns = []
+        for match in pattern.finditer(query):
+            column = aliases[match.group(0)]
+            # "p90 lead time" asks for a percentile column rather than the average
+            if len(percentiles) == 1 and f"{column}_p{percentiles[0]}" in metrics_df.columns:
+                column = f"{column}_p{percentiles[0]}"
+            if column not in columns:
+                columns.append(column)
+        return columns
+
+    def _repositories(self, query, metrics_df):
+        if "repo_name" not in metrics_df.columns or len(metrics_df) == 1:
+            return metrics_df
+        names = metrics_df["repo_name"].astype(str)
+        mentioned = names.map(lambda name: name.lower() in query or re.search(rf"\b{re.escape(name.split('/')[-1].lower())}\b", query) is not None)
+        return metrics_df[mentioned] if mentioned.any() else metrics_df
+
+    @staticmethod
+    def _name(row):
+        return row["repo_name"] if "repo_name" in row else "This repository"
+
+    def _lookup(self, columns, rows):
+        lines = []
+        for _, row in rows.iterrows():
+            values = ", ".join(f"{_label(column)}: {format_value(column, row[column])}" for column in columns)
+            lines.append(f"{self._name(row)} has {values}.")
+        return "\n\n".join(lines)
+
+    def _compare_metrics(self, columns, row):
+        (first, second), values = columns, [row[column] for column in columns]
+        answer = f"{_label(first)} is {format_value(first, values[0])} and {_label(second)} is {format_value(second, values[1])}."
+        if any(pd.isna(value) for value in values) or _unit(first) != _unit(second):
+            return answer
+        if values[0] == values[1]:
+            return f"{answer} They are equal."
+        higher = first if values[0] > values[1] else second
+        return f"{answer} The higher of the two is {_label(higher)}."
+
+    def _extreme(self, column, rows, highest):
+        values = rows[column].dropna()
+        if values.empty:
+            return f"No repository has a value for {_label(column)}."
+        index = values.idxmax() if highest else values.idxmin()
+        return (f"{rows.loc[index, 'repo_name']} has the {'highest' if highest else 'lowest'} {_label(column)}: "
+                f"{format_value(column, values[index])}.")
+
+    def _threshold(self, column, rows, match):
+        phrase, number, percent = match.groups()
+        operator = THRESHOLD_OPERATORS.get(phrase, ">")
+        limit = float(number)
+        # "above 80%" and "above 80" both mean 0.8 for a rate
+        if column in RATE_METRICS and (percent or limit > 1):
+            limit /= 100
+        compare = {">": lambda v: v > limit, ">=": lambda v: v >= limit, "<": lambda v: v < limit, "<=": lambda v: v <= limit}[operator]
+        shown_limit = format_value(column, limit)
+        lines = []
+        for _, row in rows.iterrows():
+            value = row[column]
+            if pd.isna(value):
+                lines.append(f"{self._name(row)} has no value for {_label(column)}.")
+                continue
+            verdict = "Yes" if compare(value) else "No"
+            lines.append(f"{verdict}: {self._name(row)} has {_label(column)} {format_value(column, value)} "
+                         f"({operator} {shown_limit} {'holds' if verdict == 'Yes' else 'does not hold'}).")
+        return "\n\n".join(lines)
+
+
+_shared_router = None
+_shared_router_lock = threading.Lock()
+
+
+def get_intent_router():
+    """Returns the process-wide router, so its hit counters cover every session."""
+    global _shared_router
+    with _shared_router_lock:
+        if _shared_router is None:
+            _shared_router = IntentRouter()
+        return _shared_router
@@ -1,42 +1,101 @@
 import os
+from typing import Iterator
+
 from groq import Groq
 import pandas as pd
 
+from query_interface.intent_router import get_intent_router
+from query_interface.response_cache import get_response_cache
+
+MODEL = "llama3-8b-8192"
+
 class NLPProcessor:
-    def __init__(self):
-        self.client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+    def __init__(self, response_cache=None, intent_router=None):
+        # GROQ_BASE_URL points the client at another OpenAI-compatible server, e.g. a local stub
+        self.client = Groq(api_key=os.environ.get("GROQ_API_KEY"), base_url=os.environ.get("GROQ_BASE_URL"))
+        self.response_cache = response_cache or get_response_cache()
+        self.intent_router = intent_router or get_intent_router()
+
+    def _messages(self, query: str, metrics_df: pd.DataFrame) -> list:
+        # Include repository information as part of the query context
+        repo_insights = "This repository has the following metrics: "
+        for col in metrics_df.columns:
+            repo_insights += f"{col}: {metrics_df[col].values[0]}. "
+
+        # Formatting the query with more repository/project insights
+        formatted_query = f"You are a helpful assistant. Provide a response based on these repository metrics: {repo_insights}. Question: {query}"
+        return [
+            {
+                "role": "user",
+                "content": formatted_query,
+            }
+        ]
 
     def process_query(self, query: str, metrics_df: pd.DataFrame) -> str:
         """
         Processes the user's query using Groq API and returns the result.
-        
+        Direct metric questions are answered locally by the intent router, and repeated
+        questions about the same metrics from the response cache.
+
         :param query: User's natural language question.
         :param metrics_df: DataFrame containing repository metrics.
         :return: NLP-generated response to the user's query.
         """
         try:
-            # Include repository information as part of the query context
-            repo_insights = "This repository has the following metrics: "
-            for col in metrics_df.columns:
-                repo_insights += f"{col}: {metrics_df[col].values[0]}. "
-
-            # Formatting the query with more repository/project insights
-            formatted_query = f"You are a helpful assistant. Provide a response based on these repository metrics: {repo_insights}. Question: {query}"
+            response = self.intent_router.route(query, metrics_df)
+            if response is None:
+                response = self.response_cache.get(query, metrics_df)
+            if response is not None:
+                return response
 
             # Sending the query to Groq's API
             chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "user",
-                        "content": formatted_query,
-                    }
-                ],
-                model="llama3-8b-8192",
+                messages=self._messages(query, metrics_df),
+                model=MODEL,
             )
 
             # Extracting and returning the response from Groq
             response = chat_completion.choices[0].message.content
+            # Errors are returned below without being cached, so the next attempt asks again
+            self.response_cache.put(query, metrics_df, response)
             return response
 
         except Exception as e:
             return f"An error occurred while processing the query: {e}"
+
+    def stream_query(self, query: str, metrics_df: pd.DataFrame) -> Iterator[str]:
+        """
+        Like process_query, but yields the response in pieces as Groq generates them.
+        Local and cached responses are yielded whole.
+
+        :param query: User's natural language question.
+        :param metrics_df: DataFrame containing repository metrics.
+        :return: Iterator over the text chunks of the response.
+        """
+        try:
+            response = self.intent_router.route(query, metrics_df)
+            if response is None:
+                response = self.response_cache.get(query, metrics_df)
+            if response is not None:
+                yield response
+                return
+
+            stream = self.client.chat.completions.create(
+                messages=self._messages(query, metrics_df),
+                model=MODEL,
+                stream=True,
+            )
+            chunks = []
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    chunks.append(token)
+                    yield token
+            # Only complete, non-empty responses are cached; a stream closed early never gets here
+            if chunks:
+                self.response_cache.put(query, metrics_df, "".join(chunks))
+
+        except Exception as e:
+            yield f"An error occurred while processing the query: {e}"
@@ -0,0 +1,109 @@
+import difflib
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+RESPONSE_CACHE_PATH = os.getenv("GITPULSE_RESPONSE_CACHE_PATH", os.path.join(".gitpulse_cache", "responses.sqlite3"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("GITPULSE_RESPONSE_CACHE_ENTRIES", "1000"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("GITPULSE_RESPONSE_CACHE_TTL", str(24 * 60 * 60)))
+# Similarity (0-1) above which a differently worded question reuses a cached answer; 0 disables it
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("GITPULSE_RESPONSE_CACHE_SIMILARITY", "0"))
+
+
+def normalize_query(query):
+    """Lowercases a question and drops punctuation and extra whitespace, so trivial variants share an entry."""
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+def metrics_fingerprint(metrics_df):
+    """Returns a hash of a metrics DataFrame's columns and values; any changed metric gives a new one."""
+    digest = hashlib.sha256(repr(list(metrics_df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(metrics_df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """Disk-backed cache of LLM answers, keyed on the normalized question and the metrics it was asked about.
+
+    Answers expire after ttl seconds, and the least recently used ones are evicted beyond max_entries.
+    With a similarity threshold, a question missing an exact entry may reuse the answer to the closest
+    cached question about the same metrics.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+                 ttl=RESPONSE_CACHE_TTL_SECONDS, similarity=RESPONSE_CACHE_SIMILARITY):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "metrics_hash TEXT, query TEXT, response TEXT, created REAL, accessed REAL, "
+            "PRIMARY KEY (metrics_hash, query))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.conn.commit()
+
+    def get(self, query, metrics_df):
+        """Returns the cached answer to a question about these metrics, or None."""
+        query, metrics_hash = normalize_query(query), metrics_fingerprint(metrics_df)
+        now = time.time()
+        with self.lock:
+            self.conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            row = self.conn.execute(
+                "SELECT query, response FROM responses WHERE metrics_hash = ? AND query = ?", (metrics_hash, query)
+            ).fetchone()
+            if row is None and self.similarity > 0:
+                row = self._closest(metrics_hash, query)
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE responses SET accessed = ? WHERE metrics_hash = ? AND query = ?", (now, metrics_hash, row[0])
+                )
+            self.conn.commit()
+        return row[1] if row is not None else None
+
+    def _closest(self, metrics_hash, query):
+        rows = self.conn.execute("SELECT query, response FROM responses WHERE metrics_hash = ?", (metrics_hash,)).fetchall()
+        best, best_ratio = None, self.similarity
+        for row in rows:
+            ratio = difflib.SequenceMatcher(None, query, row[0]).ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = row, ratio
+        return best
+
+    def put(self, query, metrics_df, response):
+        """Stores an answer, then evicts the least recently used entries beyond max_entries."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (metrics_hash, query, response, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (metrics_fingerprint(metrics_df), normalize_query(query), response, now, now),
+            )
+            self.conn.execute(
+                "DELETE FROM responses WHERE rowid IN "
+                "(SELECT rowid FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self.conn.commit()
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Returns the process-wide cache, so every session shares one connection."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache()
+        return _shared_cache
@@ -1,6 +1,12 @@
+import time
+from typing import Iterable
+
 import streamlit as st
 import pandas as pd
 
+# Minimum seconds between redraws of a streaming response; Streamlit sends each redraw to the browser
+STREAM_REDRAW_INTERVAL = 0.05
+
 class ResponseGenerator:
     def display_response(self, response: str) -> str:
         """
@@ -19,6 +25,28 @@ class ResponseGenerator:
         # Add logic for other relevant metrics or data visualizations
         return response
 
+    def stream_response(self, chunks: Iterable[str]) -> str:
+        """
+        Renders a response into the bot chat bubble as its chunks arrive.
+
+        :param chunks: Text chunks, e.g. from NLPProcessor.stream_query.
+        :return: The complete response.
+        """
+        st.markdown("### Response to your query:")
+        bubble = st.empty()
+        response, last_redraw = "", 0.0
+        for chunk in chunks:
+            response += chunk
+            now = time.monotonic()
+            if now - last_redraw >= STREAM_REDRAW_INTERVAL:
+                bubble.markdown(f'<div class="chat-bubble-bot">{response}▌</div>', unsafe_allow_html=True)
+                last_redraw = now
+        bubble.markdown(f'<div class="chat-bubble-bot">{response}</div>', unsafe_allow_html=True)
+
+        if "commits" in response.lower():
+            self.plot_metric("Commits Over Time")
+        return response
+
     def plot_metric(self, metric_name: str):
         """
         Simulate the display of a metric visualization based on a query.
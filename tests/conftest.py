@@ -0,0 +1,29 @@
+import pytest
+
+from data_collection.github_api import GitHubDataCollector
+from data_collection.language_cache import LanguageCache
+from data_collection.sync_store import SyncStore
+from tests.fake_github import FakeGitHub
+
+
+@pytest.fixture
+def fake_github():
+    with FakeGitHub() as fake:
+        yield fake
+
+
+@pytest.fixture
+def make_collector(fake_github, tmp_path, monkeypatch):
+    """Builds collectors against the fake server, with their on-disk state under tmp_path."""
+    monkeypatch.setenv("GITHUB_TOKEN", "test-token")
+    monkeypatch.delenv("GITHUB_TOKENS", raising=False)
+
+    def make(**kwargs):
+        collector = GitHubDataCollector(
+            http_cache=False, base_url=fake_github.url, graphql_url=f"{fake_github.url}/graphql", **kwargs
+        )
+        collector.sync_store = SyncStore(str(tmp_path / "sync"))
+        collector.language_cache = LanguageCache(str(tmp_path / "languages.json"))
+        return collector
+
+    return make
@@ -0,0 +1,337 @@
+"""A small in-process stand-in for the GitHub REST and GraphQL APIs, for collector tests.
+
+It serves one or more repositories from plain Python data, paginates with Link headers like
+GitHub does, reports X-RateLimit-* headers and records every request it receives.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def timestamp(days):
+    """Returns the GitHub timestamp days after 2024-01-01 (fractions allowed)."""
+    return (EPOCH + timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeRepository:
+    """Repository contents: commits form a DAG from head, PRs carry their reviews."""
+
+    def __init__(self, full_name="o/r"):
+        self.full_name = full_name
+        self.commits = {}  # sha -> {"sha", "author", "date", "parents"}
+        self.head = None
+        self.pulls = []
+        self.reviews = {}  # PR number -> [review dicts]
+        self.issues = []
+        self.pushed_at = timestamp(0)
+        self.updated_at = timestamp(0)
+
+    def commit(self, sha, author, days, parents=None):
+        """Adds a commit dated `days` after the epoch on top of the current head (or the given parents)."""
+        parents = [self.head] if parents is None and self.head else (parents or [])
+        self.commits[sha] = {"sha": sha, "author": author, "date": timestamp(days), "parents": parents}
+        self.head = sha
+        return sha
+
+    def pull(self, number, author, created, merged=None, closed=None, updated=None, reviews=()):
+        closed = merged if closed is None else closed
+        self.pulls.append({
+            "number": number,
+            "state": "closed" if closed is not None else "open",
+            "user": {"login": author},
+            "created_at": timestamp(created),
+            "updated_at": timestamp(updated if updated is not None else max(d for d in (created, closed) if d is not None)),
+            "closed_at": timestamp(closed) if closed is not None else None,
+            "merged_at": timestamp(merged) if merged is not None else None,
+        })
+        self.reviews[number] = [
+            {"id": number * 100 + i, "user": {"login": login}, "state": "APPROVED", "submitted_at": timestamp(days)}
+            for i, (login, days) in enumerate(reviews)
+        ]
+
+    def issue(self, number, author, created, closed=None, updated=None):
+        self.issues.append({
+            "number": number,
+            "state": "closed" if closed is not None else "open",
+            "user": {"login": author},
+            "created_at": timestamp(created),
+            "updated_at": timestamp(updated if updated is not None else (closed if closed is not None else created)),
+            "closed_at": timestamp(closed) if closed is not None else None,
+            "reactions": {"+1": 0},
+        })
+
+    def reachable(self, sha):
+        seen, stack = set(), [sha] if sha else []
+        while stack:
+            current = stack.pop()
+            if current not in seen:
+                seen.add(current)
+                stack.extend(self.commits[current]["parents"])
+        return seen
+
+    def log(self, head=None):
+        """Commits reachable from head, newest committer date first, as `git log` lists them."""
+        shas = self.reachable(head or self.head)
+        return sorted((self.commits[sha] for sha in shas), key=lambda c: c["date"], reverse=True)
+
+
+class FakeGitHub:
+    """Serves FakeRepositories over HTTP on localhost; use as a context manager."""
+
+    def __init__(self, remaining=5000, limit=5000):
+        self.repos = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self.remaining = remaining
+        self.limit = limit
+        self.reset_at = int(time.time()) + 3600
+        self.server = None
+
+    def add(self, repo):
+        self.repos[repo.full_name] = repo
+        return repo
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                fake._handle(self, "GET")
+
+            def do_POST(self):
+                fake._handle(self, "POST")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def paths(self, prefix=""):
+        """The paths (without query string) requested so far that start with prefix."""
+        with self.lock:
+            return [path for _, path, _ in self.requests if path.startswith(prefix)]
+
+    def graphql_variables(self):
+        """The variables of every GraphQL query received so far, in order."""
+        with self.lock:
+            return [variables for _, path, variables in self.requests if path == "/graphql"]
+
+    def reset_requests(self):
+        with self.lock:
+            self.requests.clear()
+
+    # Request handling
+
+    def _handle(self, handler, method):
+        parsed = urlparse(handler.path)
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        body = None
+        if method == "POST":
+            body = json.loads(handler.rfile.read(int(handler.headers.get("Content-Length", 0))) or b"{}")
+        with self.lock:
+            # GraphQL requests are recorded with their variables
+            self.requests.append((method, parsed.path, body.get("variables", {}) if body is not None else query))
+            self.remaining = max(self.remaining - 1, 0)
+        try:
+            if method == "POST" and parsed.path == "/graphql":
+                status, payload, links = 200, self._graphql(body), None
+            else:
+                status, payload, links = self._rest(parsed.path, query)
+        except KeyError:
+            status, payload, links = 404, {"message": "Not Found"}, None
+        data = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.send_header("X-RateLimit-Limit", str(self.limit))
+        handler.send_header("X-RateLimit-Remaining", str(self.remaining))
+        handler.send_header("X-RateLimit-Reset", str(self.reset_at))
+        if links:
+            handler.send_header("Link", ", ".join(f'<{url}>; rel="{rel}"' for rel, url in links.items()))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _page(self, path, query, items, default_per_page=30):
+        per_page = int(query.get("per_page", default_per_page))
+        page = int(query.get("page", 1))
+        chunk = items[(page - 1) * per_page:page * per_page]
+        links = {}
+        if page * per_page < len(items):
+            links["next"] = f"{self.url}{path}?{urlencode({**query, 'page': page + 1})}"
+            links["last"] = f"{self.url}{path}?{urlencode({**query, 'page': (len(items) - 1) // per_page + 1})}"
+        return chunk, links
+
+    def _rest(self, path, query):
+        parts = path.strip("/").split("/")
+        if parts[0] == "users" and parts[2:] == ["repos"]:
+            repos = [self._repository_json(repo) for name, repo in sorted(self.repos.items()) if name.split("/")[0] == parts[1]]
+            return (200, *self._page(path, query, repos))
+        if parts[0] != "repos" or len(parts) < 3:
+            raise KeyError(path)
+        repo = self.repos[f"{parts[1]}/{parts[2]}"]
+        base = f"{self.url}/repos/{repo.full_name}"
+        rest = parts[3:]
+        if not rest:
+            return 200, self._repository_json(repo), None
+        if rest == ["labels"]:
+            return (200, *self._page(path, query, [{"name": "bug", "url": f"{base}/labels/bug"}]))
+        if rest == ["topics"]:
+            return 200, {"names": ["metrics"]}, None
+        if rest == ["commits"]:
+            commits = repo.log(query.get("sha"))
+            if "since" in query:
+                commits = [c for c in commits if c["date"] >= query["since"]]
+            return (200, *self._page(path, query, [self._commit_json(repo, c) for c in commits]))
+        if rest[0] == "commits" and len(rest) == 2:
+            return 200, self._commit_json(repo, repo.commits[rest[1]]), None
+        if rest[0] == "compare" and len(rest) == 2:
+            return self._compare(repo, path, query, *rest[1].split("..."))
+        if rest == ["pulls"]:
+            pulls = list(repo.pulls)
+            if query.get("sort") == "updated":
+                pulls.sort(key=lambda pr: pr["updated_at"], reverse=query.get("direction", "desc") == "desc")
+            else:
+                pulls.sort(key=lambda pr: pr["number"], reverse=True)
+            return (200, *self._page(path, query, [self._pull_json(repo, pr) for pr in pulls]))
+        if rest[0] == "pulls" and len(rest) == 2:
+            pr = next(pr for pr in repo.pulls if pr["number"] == int(rest[1]))
+            return 200, {**self._pull_json(repo, pr), "merged": pr["merged_at"] is not None}, None
+        if rest[0] == "pulls" and rest[2:] == ["reviews"]:
+            return (200, *self._page(path, query, repo.reviews[int(rest[1])]))
+        if rest == ["issues"]:
+            issues = [self._issue_json(repo, issue) for issue in repo.issues]
+            issues += [self._issue_json(repo, {**pr, "reactions": {"+1": 0}}, pull=True) for pr in repo.pulls]
+            if "since" in query:
+                issues = [issue for issue in issues if issue["updated_at"] >= query["since"]]
+            issues.sort(key=lambda issue: issue["number"], reverse=True)
+            return (200, *self._page(path, query, issues))
+        if rest[0] == "issues" and len(rest) == 2:
+            issue = next(issue for issue in repo.issues if issue["number"] == int(rest[1]))
+            return 200, self._issue_json(repo, issue), None
+        raise KeyError(path)
+
+    def _compare(self, repo, path, query, base, head):
+        head = repo.head if head in ("main", "HEAD") else head
+        if base not in repo.commits:
+            raise KeyError(base)
+        head_reachable, base_reachable = repo.reachable(head), repo.reachable(base)
+        ahead = [repo.commits[sha] for sha in head_reachable - base_reachable]
+        behind = base_reachable - head_reachable
+        status = "identical" if not ahead and not behind else "ahead" if not behind else "behind" if not ahead else "diverged"
+        # Oldest first, as the compare endpoint lists them
+        ahead.sort(key=lambda c: c["date"])
+        chunk, links = self._page(path, query, [self._commit_json(repo, c) for c in ahead], default_per_page=250)
+        payload = {
+            "url": f"{self.url}{path}",
+            "status": status,
+            "ahead_by": len(ahead),
+            "behind_by": len(behind),
+            "total_commits": len(ahead),
+            "commits": chunk,
+            "files": [],
+        }
+        return 200, payload, links
+
+    def _repository_json(self, repo):
+        return {
+            "id": 1,
+            "name": repo.full_name.split("/")[1],
+            "full_name": repo.full_name,
+            "owner": {"login": repo.full_name.split("/")[0]},
+            "url": f"{self.url}/repos/{repo.full_name}",
+            "default_branch": "main",
+            "stargazers_count": 3,
+            "forks_count": 1,
+            "open_issues_count": sum(issue["state"] == "open" for issue in repo.issues),
+            "subscribers_count": 2,
+            "language": "Python",
+            "size": 10,
+            "created_at": timestamp(0),
+            "updated_at": repo.updated_at,
+            "pushed_at": repo.pushed_at,
+        }
+
+    def _commit_json(self, repo, commit):
+        return {
+            "sha": commit["sha"],
+            "url": f"{self.url}/repos/{repo.full_name}/commits/{commit['sha']}",
+            "author": {"login": commit["author"]},
+            "committer": {"login": commit["author"]},
+            "commit": {
+                "author": {"name": commit["author"], "date": commit["date"]},
+                "committer": {"name": commit["author"], "date": commit["date"]},
+                "message": commit["sha"],
+            },
+            "parents": [{"sha": parent} for parent in commit["parents"]],
+        }
+
+    def _pull_json(self, repo, pr):
+        # List payloads lack merged (and the stats fields), so PyGithub treats them as incomplete
+        return {**pr, "url": f"{self.url}/repos/{repo.full_name}/pulls/{pr['number']}"}
+
+    def _issue_json(self, repo, issue, pull=False):
+        payload = {key: issue[key] for key in ("number", "state", "user", "created_at", "updated_at", "closed_at", "reactions")}
+        payload["url"] = f"{self.url}/repos/{repo.full_name}/issues/{issue['number']}"
+        if pull:
+            payload["pull_request"] = {"url": f"{self.url}/repos/{repo.full_name}/pulls/{issue['number']}"}
+        return payload
+
+    def _graphql(self, body):
+        variables = body["variables"]
+        repo = self.repos[f"{variables['owner']}/{variables['name']}"]
+        page_size = variables["pageSize"]
+        if "pullRequest(number" in body["query"]:
+            # The follow-up query for a PR's reviews beyond the first page
+            reviews = self._review_connection(repo, variables["number"], variables.get("cursor"), page_size)
+            return {"data": {"repository": {"pullRequest": {"reviews": reviews}}}}
+        key = "updated_at" if variables.get("orderBy") == "UPDATED_AT" else "created_at"
+        pulls = sorted(repo.pulls, key=lambda pr: pr[key], reverse=True)
+        start = int(variables.get("cursor") or 0)
+        chunk = pulls[start:start + page_size]
+        nodes = []
+        for pr in chunk:
+            nodes.append({
+                "number": pr["number"],
+                "state": "OPEN" if pr["state"] == "open" else "MERGED" if pr["merged_at"] else "CLOSED",
+                "merged": pr["merged_at"] is not None,
+                "createdAt": pr["created_at"],
+                "updatedAt": pr["updated_at"],
+                "closedAt": pr["closed_at"],
+                "mergedAt": pr["merged_at"],
+                "author": pr["user"],
+                "reviews": self._review_connection(repo, pr["number"], None, page_size),
+            })
+        end = start + len(chunk)
+        page_info = {"hasNextPage": end < len(pulls), "endCursor": str(end)}
+        return {"data": {"repository": {"pullRequests": {"pageInfo": page_info, "nodes": nodes}}}}
+
+    @staticmethod
+    def _review_connection(repo, number, cursor, page_size):
+        reviews = repo.reviews[number]
+        start = int(cursor or 0)
+        end = min(start + page_size, len(reviews))
+        return {
+            "pageInfo": {"hasNextPage": end < len(reviews), "endCursor": str(end)},
+            "nodes": [
+                {"author": review["user"], "state": review["state"], "submittedAt": review["submitted_at"]}
+                for review in reviews[start:end]
+            ],
+        }
@@ -0,0 +1,81 @@
+import asyncio
+import re
+
+import pytest
+
+from data_collection.async_github_api import AsyncGitHubDataCollector, close_session, get_session
+from tests.fake_github import FakeRepository
+
+COMMITS, ISSUES, PULLS = 150, 40, 120
+
+
+def fields(record):
+    values = {slot: getattr(record, slot) for slot in record.__slots__}
+    if "reviews" in values:
+        values["reviews"] = [fields(review) for review in values["reviews"]]
+    return repr(values)
+
+
+@pytest.fixture
+def repo(fake_github):
+    repo = FakeRepository("o/r")
+    for i in range(COMMITS):
+        repo.commit(f"c{i}", f"dev{i % 7}", i / 10)
+    for number in range(1, PULLS + 1):
+        merged = number + 1 if number % 3 else None
+        repo.pull(number, f"dev{number % 5}", number, merged=merged, reviews=[(f"rev{number % 4}", number + 0.5)])
+    for number in range(PULLS + 1, PULLS + ISSUES + 1):
+        repo.issue(number, f"dev{number % 3}", number)
+    return fake_github.add(repo)
+
+
+@pytest.fixture
+def collect(fake_github, monkeypatch):
+    """Runs a coroutine of an AsyncGitHubDataCollector against the fake server, then closes its session."""
+    monkeypatch.setenv("GITHUB_TOKEN", "test-token")
+
+    def collect(method, *args):
+        async def run():
+            try:
+                return await getattr(AsyncGitHubDataCollector(base_url=fake_github.url), method)(*args)
+            finally:
+                await close_session()
+        return asyncio.run(run())
+
+    return collect
+
+
+def test_user_repositories_are_listed(fake_github, collect, repo):
+    fake_github.add(FakeRepository("o/other"))
+    fake_github.add(FakeRepository("someone/else"))
+
+    assert collect("get_user_repositories", "o") == ["o/other", "o/r"]
+
+
+def test_repo_data_matches_the_sync_collector(fake_github, collect, make_collector, repo):
+    async_data = collect("get_repo_data", "https://github.com/o/r")
+    paths = fake_github.paths()
+    fake_github.reset_requests()
+    sync_data = make_collector().get_repo_data("https://github.com/o/r")
+
+    # Pages after the first are fanned out at once, and no list item is fetched on its own
+    assert not [path for path in paths if re.fullmatch(r"/repos/o/r/(commits|pulls|issues)/[^/]+", path)]
+    assert paths.count("/repos/o/r/commits") == 2
+    assert len([path for path in paths if path.endswith("/reviews")]) == PULLS
+
+    for dataset in ("commits", "pull_requests", "issues", "reviews"):
+        assert sorted(map(fields, async_data[dataset])) == sorted(map(fields, sync_data[dataset]))
+    assert async_data["contributors_count"] == sync_data["contributors_count"] == 7
+
+
+def test_close_session_closes_the_shared_session(fake_github, monkeypatch, repo):
+    monkeypatch.setenv("GITHUB_TOKEN", "test-token")
+
+    async def run():
+        collector = AsyncGitHubDataCollector(base_url=fake_github.url)
+        await collector.get_user_repositories("o")
+        session = get_session()
+        await close_session()
+        return session
+
+    assert asyncio.run(run()).closed
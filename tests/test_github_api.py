@@ -0,0 +1,84 @@
+import re
+
+import pytest
+
+from tests.fake_github import FakeRepository
+
+COMMITS, ISSUES, PULLS = 250, 150, 120
+
+
+@pytest.fixture
+def repo(fake_github):
+    repo = FakeRepository("o/r")
+    for i in range(COMMITS):
+        repo.commit(f"c{i}", f"dev{i % 7}", i / 10)
+    for number in range(1, PULLS + 1):
+        merged = number + 1 if number % 3 else None
+        repo.pull(number, f"dev{number % 5}", number, merged=merged, closed=merged or (number + 2 if number % 2 else None),
+                  reviews=[(f"rev{number % 4}", number + 0.5)])
+    for number in range(PULLS + 1, PULLS + ISSUES + 1):
+        repo.issue(number, f"dev{number % 3}", number, closed=number + 3 if number % 2 else None)
+    return fake_github.add(repo)
+
+
+def pages(items, page_size=100):
+    return -(-items // page_size)
+
+
+def test_get_repo_data_only_requests_list_pages(fake_github, make_collector, repo):
+    repo_data = make_collector().get_repo_data("https://github.com/o/r")
+
+    paths = fake_github.paths()
+    # No list item is completed with a request to its own URL
+    assert not [path for path in paths if re.fullmatch(r"/repos/o/r/(commits|pulls|issues)/[^/]+", path)]
+    assert paths.count("/repos/o/r/commits") == pages(COMMITS)
+    assert paths.count("/repos/o/r/issues") == pages(ISSUES + PULLS)
+    assert paths.count("/repos/o/r/pulls") == pages(PULLS)
+    # Reviews cost one request per PR on the REST backend, and nothing else does
+    assert len([path for path in paths if path.endswith("/reviews")]) == PULLS
+    assert len(paths) == 3 + pages(COMMITS) + pages(ISSUES + PULLS) + pages(PULLS) + PULLS
+
+    assert len(repo_data["commits"]) == COMMITS
+    assert len(repo_data["pull_requests"]) == PULLS
+    assert len(repo_data["issues"]) == ISSUES + PULLS
+    assert repo_data["contributors_count"] == 7
+
+
+def test_records_match_the_payloads(make_collector, repo):
+    repo_data = make_collector().get_repo_data("https://github.com/o/r")
+
+    commits = {commit.sha: commit for commit in repo_data["commits"]}
+    assert commits["c12"].author == "dev5"
+    assert commits["c12"].date.isoformat() == "2024-01-02T04:48:00+00:00"
+
+    pull_requests = {pr.number: pr for pr in repo_data["pull_requests"]}
+    assert pull_requests[4].merged and pull_requests[4].merged_at.day == 6
+    assert not pull_requests[3].merged and pull_requests[3].state == "closed"
+    assert [review.author for review in pull_requests[4].reviews] == ["rev0"]
+
+    issues = {issue.number: issue for issue in repo_data["issues"]}
+    assert issues[PULLS + 1].state == "closed" and not issues[PULLS + 1].is_pull_request
+    assert issues[1].is_pull_request
+
+
+def test_iter_repo_pages_only_requests_list_pages(fake_github, make_collector, repo):
+    pages_by_dataset = {}
+    for dataset, records in make_collector().iter_repo_pages("https://github.com/o/r"):
+        pages_by_dataset.setdefault(dataset, []).append(len(records) if isinstance(records, list) else records)
+
+    paths = fake_github.paths()
+    assert not [path for path in paths if re.fullmatch(r"/repos/o/r/(commits|pulls|issues)/[^/]+", path)]
+    assert sum(pages_by_dataset["commits"]) == COMMITS
+    assert sum(pages_by_dataset["pull_requests"]) == PULLS
+    assert sum(pages_by_dataset["issues"]) == ISSUES + PULLS
+    assert len(paths) == 1 + pages(COMMITS) + pages(ISSUES + PULLS) + pages(PULLS) + PULLS
+
+
+def test_partial_fetch_skips_unneeded_datasets(fake_github, make_collector, repo):
+    repo_data = make_collector().get_repo_data("https://github.com/o/r", datasets={"pull_requests"})
+
+    paths = fake_github.paths()
+    assert paths.count("/repos/o/r/pulls") == pages(PULLS)
+    assert not [path for path in paths if path.endswith(("/reviews", "/commits", "/issues"))]
+    assert len(repo_data["pull_requests"]) == PULLS
+    assert repo_data["contributors_count"] is None
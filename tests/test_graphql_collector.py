@@ -0,0 +1,67 @@
+import pytest
+
+from tests.fake_github import FakeRepository
+
+PULLS = 250
+
+
+@pytest.fixture
+def repo(fake_github):
+    repo = FakeRepository("o/r")
+    for i in range(20):
+        repo.commit(f"c{i}", f"dev{i % 3}", i)
+    for number in range(1, PULLS + 1):
+        merged = number + 1 if number % 3 else None
+        repo.pull(number, f"dev{number % 5}", number, merged=merged, reviews=[(f"rev{number % 4}", number + 0.5)])
+    repo.issue(PULLS + 1, "dev0", 1)
+    return fake_github.add(repo)
+
+
+def test_pull_requests_are_paged_in_batched_queries(fake_github, make_collector, repo):
+    repo_data = make_collector(backend="graphql").get_repo_data("https://github.com/o/r")
+
+    queries = fake_github.graphql_variables()
+    assert [query["cursor"] for query in queries] == [None, "100", "200"]
+    assert all(query["orderBy"] == "CREATED_AT" for query in queries)
+    # Reviews come inlined, so nothing is fetched per PR over REST
+    assert not fake_github.paths("/repos/o/r/pulls")
+
+    pull_requests = {pr.number: pr for pr in repo_data["pull_requests"]}
+    assert len(pull_requests) == PULLS
+    assert pull_requests[4].merged and pull_requests[4].merged_at.day == 6
+    assert not pull_requests[3].merged and pull_requests[3].state == "open"
+    assert [review.author for review in pull_requests[4].reviews] == ["rev0"]
+
+
+def test_reviews_beyond_the_first_page_are_fetched_with_a_follow_up_query(fake_github, make_collector, repo):
+    repo.reviews[7] = [
+        {"id": 700 + i, "user": {"login": f"rev{i}"}, "state": "COMMENTED", "submitted_at": "2024-01-09T00:00:00Z"}
+        for i in range(130)
+    ]
+
+    repo_data = make_collector(backend="graphql").get_repo_data("https://github.com/o/r")
+
+    follow_ups = [query for query in fake_github.graphql_variables() if "number" in query]
+    assert follow_ups == [{"owner": "o", "name": "r", "number": 7, "cursor": "100", "pageSize": 100}]
+    pull_request = next(pr for pr in repo_data["pull_requests"] if pr.number == 7)
+    assert [review.author for review in pull_request.reviews] == [f"rev{i}" for i in range(130)]
+
+
+def test_incremental_sync_stops_at_the_updated_since_cursor(fake_github, make_collector, repo):
+    collector = make_collector(backend="graphql")
+    collector.get_repo_data("https://github.com/o/r", incremental=True)
+    fake_github.reset_requests()
+
+    # Two PRs change after the first sync, and one is opened
+    for pr in repo.pulls[:2]:
+        pr["updated_at"] = "2025-01-01T00:00:00Z"
+    repo.pull(PULLS + 2, "dev9", 400)
+
+    repo_data = collector.get_repo_data("https://github.com/o/r", incremental=True)
+
+    queries = fake_github.graphql_variables()
+    assert len(queries) == 1 and queries[0]["orderBy"] == "UPDATED_AT"
+    assert len(repo_data["pull_requests"]) == PULLS + 1
+    pull_requests = {pr.number: pr for pr in repo_data["pull_requests"]}
+    assert pull_requests[1].updated_at.year == 2025
+    assert pull_requests[PULLS + 2].author == "dev9"
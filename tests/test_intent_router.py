@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from query_interface.intent_router import IntentRouter
+
+
+@pytest.fixture
+def metrics_df():
+    return pd.DataFrame([{
+        "repo_name": "o/r",
+        "commit_frequency": 0.5,
+        "pr_merge_rate": 0.42,
+        "active_days": 30,
+        "pr_lead_time": 2.5,
+        "pr_lead_time_p90": 7.25,
+        "pr_review_time": 1.0,
+        "bus_factor": 2,
+        "distinct_contributors": 12,
+    }])
+
+
+@pytest.mark.parametrize("query, answer", [
+    ("What's the merge rate?", "o/r has pr merge rate: 42.0%."),
+    ("commit frequency", "o/r has commit frequency: 0.50."),
+    ("What is the p90 lead time?", "o/r has p90 pr lead time: 7.25 days."),
+    ("Is the bus factor above 2?", "No: o/r has bus factor 2 (> 2 does not hold)."),
+    ("Is the merge rate at least 40%?", "Yes: o/r has pr merge rate 42.0% (>= 40.0% holds)."),
+    ("lead time vs review time",
+     "pr lead time is 2.50 days and pr review time is 1.00 days. The higher of the two is pr lead time."),
+    ("How many contributors are there?", "o/r has distinct contributors: 12."),
+    ("How many active days?", "o/r has active days: 30."),
+])
+def test_direct_metric_questions_are_answered_locally(metrics_df, query, answer):
+    router = IntentRouter()
+
+    assert router.route(query, metrics_df) == answer
+    assert router.hits == 1 and router.misses == 0
+
+
+@pytest.mark.parametrize("query", [
+    # Counts and lists that no metric column holds
+    "Does the repo have more than 100 commits?",
+    "What is the total number of commits in the last month?",
+    "How many commits are there?",
+    "Who are the top contributors?",
+    "Who are the reviewers?",
+    "List the contributors with the most active days",
+    "How many merged PRs have a lead time over 3 days?",
+    # Open-ended questions naming a metric
+    "Why is the lead time so long?",
+    "How can we improve the merge rate?",
+    # No metric at all
+    "Hello there",
+])
+def test_other_questions_fall_through_to_the_llm(metrics_df, query):
+    router = IntentRouter()
+
+    assert router.route(query, metrics_df) is None
+    assert router.hits == 0 and router.misses == 1
+
+
+def test_extremes_across_repositories():
+    metrics_df = pd.DataFrame([
+        {"repo_name": "o/a", "active_days": 10, "pr_merge_rate": 0.9},
+        {"repo_name": "o/b", "active_days": 25, "pr_merge_rate": 0.5},
+    ])
+
+    router = IntentRouter()
+    assert router.route("Which repo has the most active days?", metrics_df) == "o/b has the highest active days: 25."
+    assert router.route("Lowest merge rate?", metrics_df) == "o/b has the lowest pr merge rate: 50.0%."
+    assert router.hit_rate == 1.0
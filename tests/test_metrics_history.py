@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from data_collection import metrics_history
+from metrics import registry
+
+
+def test_plugin_metrics_are_kept_in_snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics_history, "HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(registry, "_metrics", dict(registry._metrics))
+    snapshot_at = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+    # A snapshot from before the plugin was registered reads back as null
+    metrics_history.append_snapshot("u", pd.DataFrame([{"repo_name": "o/r", "pr_merge_rate": 0.5}]), snapshot_at)
+    registry.register_metric("open_pr_count", ["pull_requests"], lambda context: 3)
+    metrics_history.append_snapshot(
+        "u", pd.DataFrame([{"repo_name": "o/r", "pr_merge_rate": 0.6, "open_pr_count": 3}]), snapshot_at
+    )
+    metrics_history.compact_partition("2024-01-02")
+
+    history = metrics_history.load_history(["pr_merge_rate", "open_pr_count"]).sort_values("pr_merge_rate")
+    assert history["pr_merge_rate"].tolist() == [0.5, 0.6]
+    assert history["open_pr_count"].isna().tolist() == [True, False]
+    assert history["open_pr_count"].iloc[1] == 3
+    assert len(list((tmp_path / "date=2024-01-02").glob("*.parquet"))) == 1
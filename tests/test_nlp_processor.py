@@ -0,0 +1,99 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from query_interface.intent_router import IntentRouter
+from query_interface.nlp_processor import NLPProcessor
+from query_interface.response_cache import ResponseCache
+
+QUESTION = "Why is the lead time so long?"
+
+
+class StubCompletions:
+    """Streams the configured chunks as an OpenAI-compatible chat completions server does."""
+
+    def __init__(self):
+        self.chunks = []
+        self.requests = 0
+        self.server = None
+
+    def __enter__(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.requests += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for content in stub.chunks:
+                    payload = {
+                        "id": "stub", "object": "chat.completion.chunk", "created": 0, "model": "stub",
+                        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    with StubCompletions() as stub:
+        yield stub
+
+
+@pytest.fixture
+def processor(stub, tmp_path, monkeypatch):
+    # The client reads GROQ_BASE_URL when it is built
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setenv("GROQ_BASE_URL", f"http://127.0.0.1:{stub.server.server_address[1]}")
+    return NLPProcessor(response_cache=ResponseCache(str(tmp_path / "responses.sqlite3")), intent_router=IntentRouter())
+
+
+@pytest.fixture
+def metrics_df():
+    return pd.DataFrame([{"repo_name": "o/r", "pr_lead_time": 9.5}])
+
+
+def test_stream_yields_chunks_in_order_and_caches_the_full_answer(stub, processor, metrics_df):
+    stub.chunks = ["Reviews ", "take ", "long."]
+
+    assert list(processor.stream_query(QUESTION, metrics_df)) == ["Reviews ", "take ", "long."]
+    assert processor.response_cache.get(QUESTION, metrics_df) == "Reviews take long."
+
+    # The cached answer comes back whole, without another request
+    assert list(processor.stream_query(QUESTION, metrics_df)) == ["Reviews take long."]
+    assert stub.requests == 1
+
+
+def test_stream_closed_early_is_not_cached(stub, processor, metrics_df):
+    stub.chunks = ["Reviews ", "take ", "long."]
+
+    stream = processor.stream_query(QUESTION, metrics_df)
+    assert next(stream) == "Reviews "
+    stream.close()
+
+    assert processor.response_cache.get(QUESTION, metrics_df) is None
+
+
+def test_empty_stream_is_not_cached(stub, processor, metrics_df):
+    stub.chunks = []
+
+    assert list(processor.stream_query(QUESTION, metrics_df)) == []
+    assert processor.response_cache.get(QUESTION, metrics_df) is None
@@ -0,0 +1,105 @@
+import threading
+import time
+
+from data_collection.rate_limiter import BACKGROUND, INTERACTIVE, RequestScheduler
+
+
+def headers(remaining, limit=5000, reset_in=3600):
+    return {
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-reset": str(int(time.time() + reset_in)),
+    }
+
+
+class FakeRequester:
+    """Answers every request with the given status and rate-limit headers, charging quota unless it is a 304."""
+
+    def __init__(self, remaining, status=200, retry_after=None):
+        self.remaining = remaining
+        self.status = status
+        self.retry_after = retry_after
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def requestJson(self, verb, url, parameters=None, headers_=None, input=None, cnx=None, follow_302_redirect=False):
+        with self.lock:
+            self.calls += 1
+            if self.status != 304:
+                self.remaining -= 1
+            response_headers = headers(self.remaining)
+            if self.retry_after is not None and self.calls == 1:
+                response_headers["retry-after"] = str(self.retry_after)
+                return 403, response_headers, "{}"
+            return self.status, response_headers, "{}"
+
+
+def test_requests_are_not_paced_above_the_reserve():
+    scheduler = RequestScheduler()
+    requester = FakeRequester(remaining=4990)
+    scheduler.install({"a": requester})
+
+    started = time.time()
+    for _ in range(200):
+        requester.requestJson("GET", "/x")
+    assert time.time() - started < 1
+    assert scheduler.states["a"].remaining == 4790
+    assert scheduler.states["a"].in_flight == 0
+
+
+def test_requests_are_paced_near_the_reserve():
+    scheduler = RequestScheduler(pacing_reserve=0.05)
+    scheduler.update("a", headers(remaining=10, reset_in=100))
+
+    scheduler.acquire(["a"])
+    scheduler.release("a", headers(remaining=9, reset_in=100))
+    # 9 requests left for 100 seconds: the next one waits about 11 seconds
+    assert 10 < scheduler.states["a"].seconds_until_available(time.time()) < 12.5
+
+    scheduler.update("a", headers(remaining=1000, reset_in=100))
+    assert scheduler.states["a"].seconds_until_available(time.time()) == 0
+
+
+def test_not_modified_responses_are_not_charged():
+    scheduler = RequestScheduler()
+    requester = FakeRequester(remaining=300, status=304)
+    scheduler.install({"a": requester})
+
+    for _ in range(50):
+        requester.requestJson("GET", "/x")
+    assert scheduler.states["a"].remaining == 300
+
+
+def test_background_requests_leave_the_reserve_to_interactive_ones():
+    scheduler = RequestScheduler(background_reserve=0.2, max_wait=0.1)
+    scheduler.update("a", headers(remaining=900))
+
+    assert scheduler.acquire(["a"], INTERACTIVE) == "a"
+    blocked = threading.Event()
+
+    def background():
+        scheduler.acquire(["a"], BACKGROUND)
+        blocked.set()
+
+    threading.Thread(target=background, daemon=True).start()
+    assert not blocked.wait(0.3)
+
+
+def test_requests_go_to_the_token_with_most_quota():
+    scheduler = RequestScheduler()
+    scheduler.update("a", headers(remaining=100))
+    scheduler.update("b", headers(remaining=4000))
+
+    assert scheduler.acquire(["a", "b"]) == "b"
+
+
+def test_retry_after_blocks_the_token():
+    scheduler = RequestScheduler()
+    requester = FakeRequester(remaining=4000, retry_after=1)
+    scheduler.install({"a": requester})
+
+    started = time.time()
+    status, _, _ = requester.requestJson("GET", "/x")
+    assert status == 200
+    assert requester.calls == 2
+    assert time.time() - started >= 0.9
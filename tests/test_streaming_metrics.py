@@ -0,0 +1,40 @@
+import re
+
+import pandas as pd
+import pytest
+
+from metrics.calculator import MetricsCalculator
+from tests.fake_github import FakeRepository
+
+
+@pytest.fixture
+def repo(fake_github):
+    repo = FakeRepository("o/r")
+    for i in range(230):
+        repo.commit(f"c{i}", f"dev{i % 6}", i / 3)
+    for number in range(1, 140):
+        merged = number + 2 if number % 3 else None
+        wait = (number * 7 % 11) / 4
+        reviews = [(f"rev{number % 4}", number + wait), (f"rev{(number + 1) % 4}", number + wait + 1)] if number % 5 else []
+        repo.pull(number, f"dev{number % 5}", number, merged=merged, closed=merged or (number + 4 if number % 2 else None),
+                  reviews=reviews)
+    for number in range(140, 260):
+        repo.issue(number, f"dev{number % 3}", number / 2, closed=number / 2 + number % 9 if number % 4 else None)
+    return fake_github.add(repo)
+
+
+def test_streaming_metrics_match_calculate_metrics(fake_github, make_collector, repo):
+    # Guards the streaming accumulators against drifting from the formulas in MetricsDefinitions
+    updates = []
+    streamed = MetricsCalculator.calculate_metrics_streaming(
+        make_collector().iter_repo_pages("https://github.com/o/r"), on_update=updates.append
+    )
+    calculated = MetricsCalculator(make_collector().get_repo_data("https://github.com/o/r")).calculate_metrics()
+
+    assert len(updates) > 1
+    assert list(streamed.columns) == list(calculated.columns)
+    # Percentile sketches depend on how values are batched, so pages fed one by one only come close
+    percentiles = [column for column in calculated.columns if re.search(r"_p\d+$", column)]
+    exact = [column for column in calculated.columns if column not in percentiles]
+    pd.testing.assert_frame_equal(streamed[exact], calculated[exact], check_dtype=False)
+    pd.testing.assert_frame_equal(streamed[percentiles], calculated[percentiles], check_dtype=False, rtol=0.05)
@@ -5,7 +5,7 @@ class Charts:
     def plot_commit_frequency(metrics_df):
         """Creates a bar chart for commit frequency with proper formatting."""
         if "commit_frequency" not in metrics_df.columns or metrics_df.empty:
-            return go.Figure()  # Return an empty figure if no data
+            return None  # Nothing to chart when the metric was not calculated
 
         fig = px.bar(
             metrics_df,
@@ -26,12 +26,13 @@ class Charts:
     def plot_pr_merge_rate(metrics_df):
         """Creates a gauge chart to show PR merge rate."""
         if "pr_merge_rate" not in metrics_df.columns or metrics_df.empty:
-            return go.Figure()
+            return None
 
         fig = go.Figure(go.Indicator(
             mode="gauge+number",
-            value=metrics_df["pr_merge_rate"].iloc[0] * 100,
-            title={"text": "PR Merge Rate (%)"},
+            # Averaged across repositories when a batch run put several in the frame
+            value=metrics_df["pr_merge_rate"].mean() * 100,
+            title={"text": "PR Merge Rate (%)" if len(metrics_df) == 1 else "Average PR Merge Rate (%)"},
             gauge={
                 'axis': {'range': [None, 100]},
                 'bar': {'color': "darkblue"},
@@ -54,7 +55,7 @@ class Charts:
     def plot_issue_resolution_time(metrics_df):
         """Creates a bar chart for issue resolution time."""
         if "issue_resolution_time" not in metrics_df.columns or metrics_df.empty:
-            return go.Figure()
+            return None
 
         fig = px.bar(
             metrics_df,
@@ -76,7 +77,7 @@ class Charts:
     @staticmethod
     def plot_pr_lead_time(metrics_df):
         if "pr_lead_time" not in metrics_df.columns or metrics_df.empty:
-            return go.Figure()
+            return None
 
         fig = px.bar(
         metrics_df,
@@ -98,20 +99,44 @@ class Charts:
     @staticmethod
     def plot_pr_review_time(metrics_df):
         if "pr_review_time" not in metrics_df.columns or metrics_df.empty:
-            return go.Figure()
+            return None
 
         fig = px.bar(
         metrics_df,
         x="repo_name",
-        y="pr_lead_time",  # Adjust for pr_review_time
-        title="PR Lead Time by Repository",
-        labels={"pr_lead_time": "PR Lead Time (days)", "repo_name": "Repository"},
+        y="pr_review_time",
+        title="PR Review Time by Repository",
+        labels={"pr_review_time": "PR Review Time (days)", "repo_name": "Repository"},
         template="plotly_dark",
         text_auto=True,
-        color='pr_lead_time',
+        color='pr_review_time',
         color_continuous_scale='Cividis'
     )
-        fig.update_layout(xaxis_title="Repository", yaxis_title="PR Lead Time (days)")
+        fig.update_layout(xaxis_title="Repository", yaxis_title="PR Review Time (days)")
         fig.update_traces(textposition='outside', hoverinfo="x+y+text")
         return fig
 
+
+    # Time-series chart for the windowed metrics (see metrics/windows.py)
+    @staticmethod
+    def plot_windowed_metrics(time_series_df, window="weekly"):
+        """Creates line charts of commits, merge rate, lead time and resolution time over time."""
+        if time_series_df is None or time_series_df.empty:
+            return go.Figure()
+
+        series = time_series_df[time_series_df["window"] == window]
+        fig = px.line(
+            series,
+            x="date",
+            y="value",
+            facet_row="metric",
+            title=f"Repository Activity ({window.capitalize()})",
+            labels={"date": "Date", "value": ""},
+            template="plotly_dark",
+            height=800,
+        )
+        # Each metric has its own scale (commits vs. rates vs. days)
+        fig.update_yaxes(matches=None)
+        fig.for_each_annotation(lambda a: a.update(text=a.text.split("=")[-1]))
+        fig.update_layout(title_font_size=18)
+        return fig
@@ -2,13 +2,24 @@ import streamlit as st
 from visualization.charts import Charts
 
 class Dashboard:
-    def __init__(self, metrics_df):
+    def __init__(self, metrics_df, time_series_df=None):
         self.metrics_df = metrics_df
+        self.time_series_df = time_series_df
 
     def display(self):
         """Displays repository metrics with charts on Streamlit."""
-        st.plotly_chart(Charts.plot_commit_frequency(self.metrics_df))
-        st.plotly_chart(Charts.plot_pr_merge_rate(self.metrics_df))
-        st.plotly_chart(Charts.plot_issue_resolution_time(self.metrics_df))
-        st.plotly_chart(Charts.plot_pr_lead_time(self.metrics_df))  # New
-        st.plotly_chart(Charts.plot_pr_review_time(self.metrics_df))  # New
+        charts = [
+            Charts.plot_commit_frequency,
+            Charts.plot_pr_merge_rate,
+            Charts.plot_issue_resolution_time,
+            Charts.plot_pr_lead_time,  # New
+            Charts.plot_pr_review_time,  # New
+        ]
+        for chart in charts:
+            fig = chart(self.metrics_df)
+            # Metrics left out of a partial run have no chart
+            if fig is not None:
+                st.plotly_chart(fig)
+        if self.time_series_df is not None and not self.time_series_df.empty:
+            window = st.selectbox("Activity window", options=list(self.time_series_df["window"].unique()))
+            st.plotly_chart(Charts.plot_windowed_metrics(self.time_series_df, window))